@@ -0,0 +1,117 @@
+# benchmarks/bench_dedup.py
+"""
+Near-duplicate detection benchmark on a synthetic corpus.
+
+    python -m benchmarks.bench_dedup [--n 1000000] [--dup-rate 0.05]
+
+Feeds n synthetic (title, snippet) papers through PaperDeduper.filter in page-sized
+batches, a share of them perturbed copies of earlier papers under a new URL. Reports
+per-doc cost as the index grows (flat = sub-linear total), precision/recall against
+the injected duplicates, and peak RSS.
+"""
+import argparse
+import random
+import resource
+import string
+import time
+from core.dedup import PaperDeduper
+from scraper.parser import Paper
+
+
+def make_vocab(rng, size=5000):
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(size)]
+
+
+def perturb(rng, title, snippet):
+    """Same paper as seen through another URL: cosmetic title changes, lightly edited snippet."""
+    words = title.split()
+    kind = rng.randrange(4)
+    if kind == 0:
+        title = "[PDF] " + title.upper()
+    elif kind == 1:
+        title = title.replace(" ", ": ", 1) + "."
+    elif kind == 2 and len(words) > 6:
+        title = " ".join(words[:-1])
+    else:
+        title = title.title() + " …"
+    s = snippet.split()
+    s[rng.randrange(len(s))] = "revised"
+    return title, " ".join(s)
+
+
+def synthetic_corpus(n, dup_rate, seed=7):
+    """Yields (url, title, snippet, is_dup)."""
+    rng = random.Random(seed)
+    vocab = make_vocab(rng)
+    originals = []
+    for i in range(n):
+        if originals and rng.random() < dup_rate:
+            title, snippet = perturb(rng, *rng.choice(originals))
+            yield f"https://mirror.example/{i}", title, snippet, True
+        else:
+            title = " ".join(rng.choices(vocab, k=rng.randint(6, 12)))
+            snippet = " ".join(rng.choices(vocab, k=25))
+            if len(originals) < 200000:
+                originals.append((title, snippet))
+            else:
+                originals[rng.randrange(len(originals))] = (title, snippet)
+            yield f"https://publisher.example/{i}", title, snippet, False
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--n", type=int, default=1_000_000, help="corpus size")
+    ap.add_argument("--dup-rate", type=float, default=0.05, help="share of injected near-duplicates")
+    ap.add_argument("--batch", type=int, default=1000, help="papers per filter() call")
+    ap.add_argument("--report-every", type=int, default=100_000)
+    args = ap.parse_args()
+
+    deduper = PaperDeduper()
+    tp = fp = fn = 0
+    batch, truth = [], {}
+    seen, chunk_time, total_time = 0, 0.0, 0.0
+
+    print(f"{'docs':>10}{'index size':>12}{'us/doc':>10}{'peak RSS MB':>13}")
+
+    def flush():
+        nonlocal tp, fp, fn, chunk_time, total_time
+        t0 = time.perf_counter()
+        _, aliases = deduper.filter(batch)
+        elapsed = time.perf_counter() - t0
+        chunk_time += elapsed
+        total_time += elapsed
+        flagged = {alias for alias, _, _ in aliases}
+        for paper in batch:
+            is_dup, hit = truth[paper[1]], paper[1] in flagged
+            tp += is_dup and hit
+            fp += hit and not is_dup
+            fn += is_dup and not hit
+        batch.clear()
+        truth.clear()
+
+    for url, title, snippet, is_dup in synthetic_corpus(args.n, args.dup_rate):
+        batch.append(Paper(title, url, snippet, "bench", None))
+        truth[url] = is_dup
+        seen += 1
+        if len(batch) == args.batch:
+            flush()
+        if seen % args.report_every == 0:
+            if batch:
+                flush()
+            print(f"{seen:>10}{len(deduper):>12}{chunk_time / args.report_every * 1e6:>10.1f}{peak_rss_mb():>13.0f}")
+            chunk_time = 0.0
+    if batch:
+        flush()
+
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    print(f"\n{seen} docs in {total_time:.1f}s ({seen / total_time:,.0f} docs/sec)")
+    print(f"near-duplicates: precision {precision:.4f}  recall {recall:.4f}  (tp={tp} fp={fp} fn={fn})")
+
+
+if __name__ == "__main__":
+    main()
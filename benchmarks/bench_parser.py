@@ -0,0 +1,64 @@
+# benchmarks/bench_parser.py
+"""
+Compares ScholarParser backends over the saved result pages in benchmarks/fixtures.
+
+    python -m benchmarks.bench_parser [--rounds 200]
+"""
+import argparse
+import glob
+import os
+import statistics
+import time
+from scraper.parser import ScholarParser, available_backends
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load_fixtures():
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+
+def bench_backend(backend: str, pages: list, rounds: int):
+    parser = ScholarParser(backend)
+    latencies = []
+    for _ in range(rounds):
+        for html in pages:
+            t0 = time.perf_counter()
+            parser.parse_html(html, "bench")
+            latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+    return {
+        "pages_per_sec": len(latencies) / sum(latencies),
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rounds", type=int, default=200, help="passes over the fixture set per backend")
+    args = ap.parse_args()
+
+    pages = load_fixtures()
+    if not pages:
+        raise SystemExit(f"No fixtures found in {FIXTURE_DIR}")
+
+    # Every backend must agree with the BeautifulSoup reference before we time it
+    reference = [ScholarParser("bs4").parse_html(html, "bench") for html in pages]
+
+    print(f"{len(pages)} fixture pages x {args.rounds} rounds\n")
+    print(f"{'backend':<12}{'pages/sec':>12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}  parity")
+    for backend in available_backends():
+        parser = ScholarParser(backend)
+        same = [parser.parse_html(html, "bench") for html in pages] == reference
+        r = bench_backend(backend, pages, args.rounds)
+        print(f"{backend:<12}{r['pages_per_sec']:>12.1f}{r['mean_ms']:>10.2f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}  {'ok' if same else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# benchmarks/bench_pipeline.py
+"""
+End-to-end crawl throughput against the local Scholar stand-in (no live site, no browser).
+
+    python -m benchmarks.bench_pipeline [--tabs 1,4,8] [--backends selectolax,bs4] [--batch-sizes 1,64]
+                                        [--queries 30] [--pages 3] [--latency-ms 50] [--error-rate 0.02]
+                                        [--cited-by 1] [--cited-by-budget 50]
+                                        [--json bench_results.json]
+
+Runs the real ScholarEngine.crawl path, worker -> StealthBrowser (HTTP mode) -> parser ->
+dedup -> DB writer, once per combination of worker count, parser backend and writer
+batch size. Each run gets its own process (so peak RSS is per run) and its own temp DB.
+The request scheduler is opened up so the numbers measure the pipeline, not the pacing.
+"""
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import resource
+import tempfile
+import time
+from benchmarks.stub_server import StubScholar
+from scraper.parser import available_backends
+
+
+def _pct(values, p):
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)] * 1000 if values else 0.0
+
+
+async def _crawl(run: dict, base_url: str, queries: int, pages: int, cited_by: tuple = (0, 0)) -> dict:
+    from main import ScholarEngine, build_topic_jobs
+    from core.database import ResearchDatabase
+    from core.job_store import open_job_store
+    from core.llm_brain import ResearchBrain
+    from core.metrics import metrics
+    from scraper.browser import StealthBrowser
+    from scraper.parser import ScholarParser
+    from scraper.scheduler import RequestScheduler
+
+    engine = ScholarEngine()
+    engine.db = ResearchDatabase(os.path.join(os.getcwd(), "bench.db"), max_batch=run["batch"])
+    engine.jobs = open_job_store(engine.db)
+    engine.brain = ResearchBrain(engine.db)
+    engine.parser = ScholarParser(run["backend"])
+    engine.browser = StealthBrowser(pool_size=run["tabs"], fetch_mode="http", base_url=base_url)
+    engine.browser.cache = None
+    engine.citation_depth, engine.citation_budget = cited_by
+    engine.browser.scheduler = RequestScheduler(per_minute=10_000_000, burst=run["tabs"],
+                                                retry_base=0.05, retry_max=0.5)
+    metrics.reset()
+
+    # Page latency = "fetching" event -> the page/retry/failed event of the same (query, page)
+    started_at, latencies = {}, []
+
+    def report(event):
+        if event["event"] == "fetching":
+            started_at[event["query"], event["page"]] = time.perf_counter()
+        elif event["event"] in ("page", "retry", "failed") and (event["query"], event["page"]) in started_at:
+            latencies.append(time.perf_counter() - started_at.pop((event["query"], event["page"])))
+
+    await engine.start()
+    try:
+        jobs = build_topic_jobs([f"benchmark query {i}" for i in range(queries)], pages, {})
+        totals = await engine.crawl(jobs, report)
+    finally:
+        await engine.shutdown()
+
+    elapsed = totals["elapsed_sec"] or 1e-9
+    stages = metrics.summary()["stages"]
+    return {
+        **run,
+        "pages": totals["pages"],
+        "failed": totals["failed"],
+        "papers": totals["found"],
+        "new": totals["new"],
+        "elapsed_sec": elapsed,
+        "pages_per_sec": round(totals["pages"] / elapsed, 2),
+        "papers_per_sec": round(totals["found"] / elapsed, 2),
+        "p50_ms": round(_pct(latencies, 0.50), 2),
+        "p99_ms": round(_pct(latencies, 0.99), 2),
+        "parse_p50_ms": stages.get("parse", {}).get("p50_ms", 0.0),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def _run_in_child(run, base_url, queries, pages, cited_by, results):
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as quiet:
+        os.chdir(tmp)   # Metrics file, config and DB all stay out of the repo
+        with contextlib.redirect_stdout(quiet):   # Engine chatter (retries, schema upgrade) would break the table
+            result = asyncio.run(_crawl(run, base_url, queries, pages, cited_by))
+        results.put(result)
+
+
+def run_one(run: dict, base_url: str, queries: int, pages: int, cited_by: tuple = (0, 0)) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    proc = ctx.Process(target=_run_in_child, args=(run, base_url, queries, pages, cited_by, results))
+    proc.start()
+    while True:
+        try:
+            result = results.get(timeout=1)
+            break
+        except queue.Empty:
+            if not proc.is_alive():
+                raise SystemExit(f"benchmark run {run} crashed (exit code {proc.exitcode})")
+    proc.join()
+    return result
+
+
+def _csv(value, cast=str):
+    return [cast(x) for x in value.split(",") if x]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--tabs", type=lambda v: _csv(v, int), default=[1, 4, 8], help="worker counts to sweep")
+    ap.add_argument("--backends", type=_csv, default=available_backends(), help="parser backends to sweep")
+    ap.add_argument("--batch-sizes", type=lambda v: _csv(v, int), default=[1, 64],
+                    help="DB writer batch sizes (pages per commit) to sweep")
+    ap.add_argument("--queries", type=int, default=30)
+    ap.add_argument("--pages", type=int, default=3, help="max pages per query")
+    ap.add_argument("--depth", type=int, default=2, help="full result pages the stub serves per query")
+    ap.add_argument("--latency-ms", type=float, default=50, help="mean stub response latency")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="share of stub responses that are 503s")
+    ap.add_argument("--cited-by", type=int, default=0, metavar="DEPTH", help="cited-by expansion depth (0 = off)")
+    ap.add_argument("--cited-by-budget", type=int, default=50, help="max cited-by lists queued per run")
+    ap.add_argument("--json", help="also write the results to this file")
+    args = ap.parse_args()
+
+    runs = [{"tabs": t, "backend": b, "batch": n} for t, b, n in itertools.product(args.tabs, args.backends, args.batch_sizes)]
+    results = []
+    print(f"{'tabs':>5}{'backend':>12}{'batch':>7}{'pages':>7}{'failed':>8}{'pages/s':>10}{'papers/s':>10}"
+          f"{'p50 ms':>9}{'p99 ms':>9}{'parse p50':>11}{'peak RSS MB':>13}")
+    with StubScholar(latency_ms=args.latency_ms, error_rate=args.error_rate, depth=args.depth) as stub:
+        for run in runs:
+            r = run_one(run, stub.base_url, args.queries, args.pages, (args.cited_by, args.cited_by_budget))
+            results.append(r)
+            print(f"{r['tabs']:>5}{r['backend']:>12}{r['batch']:>7}{r['pages']:>7}{r['failed']:>8}"
+                  f"{r['pages_per_sec']:>10.1f}{r['papers_per_sec']:>10.1f}{r['p50_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+                  f"{r['parse_p50_ms']:>11.2f}{r['peak_rss_mb']:>13.0f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"ts": round(time.time(), 3), "args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
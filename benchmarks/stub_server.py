@@ -0,0 +1,205 @@
+# benchmarks/stub_server.py
+"""
+Local Google Scholar stand-in serving the recorded result pages in benchmarks/fixtures.
+
+    python -m benchmarks.stub_server [--port 8765] [--latency-ms 150] [--error-rate 0.02]
+    SCHOLAR_BASE_URL=http://127.0.0.1:8765 python main.py
+
+Every (query, start) gets its own copy of a fixture: result ids, URLs, cluster ids,
+titles and snippets are re-generated from a seed of the request, so papers are unique
+across pages but identical on a repeat fetch. The first --depth pages of a query are
+full, the next one is short, anything beyond has no results.
+"""
+import argparse
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+_RESULT_ID = re.compile(r'data-cid="([^"]+)"')
+_CLUSTER_ID = re.compile(r'(?:cites|cluster)=(\d+)')
+_TITLE = r'(?<=>)[^<>]+(?=(?:</a>)?</h3>)'
+_SNIPPET = r'(?<=<div class="gs_rs">)[^<]*'
+
+VOCAB = ("learning attention graph causal protein federated optimization segmentation reinforcement "
+         "vision retrieval diffusion benchmark transformer inference robust scaling folding privacy "
+         "language sparse neural networks model training data efficient generative adversarial "
+         "contrastive representation knowledge distillation quantum molecular clinical survey").split()
+
+
+def _read(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class StubPages:
+    """Builds the page for a (query, start) request from the fixture templates."""
+    def __init__(self, depth: int = 2):
+        self.depth = depth
+        full = _read("results_full.html")
+        self.full = self._compile(full)
+        self.short = self._compile(_read("results_short.html"))
+        # Same page with every result block cut out of #gs_res_ccl_mid
+        first = full.index('<div class="gs_r gs_or gs_scl"')
+        bottom = full.index('<div id="gs_res_ccl_bot"')
+        self.empty = full[:first] + full[bottom - len("</div>"):]
+
+    @staticmethod
+    def _compile(html: str) -> list:
+        """
+        Splits a fixture once into literal chunks and slots, ("id", n) / ("cluster", n) /
+        ("title",) / ("snippet",), so rendering a page is a join rather than a rescan.
+        """
+        ids = {old: n for n, old in enumerate(dict.fromkeys(_RESULT_ID.findall(html)))}
+        clusters = {old: n for n, old in enumerate(dict.fromkeys(_CLUSTER_ID.findall(html)))}
+        alternatives = [_TITLE, _SNIPPET]
+        alternatives += [re.escape(x) for x in sorted({**ids, **clusters}, key=len, reverse=True)]
+        parts, pos = [], 0
+        for m in re.finditer("|".join(alternatives), html):
+            parts.append(html[pos:m.start()])
+            token = m.group(0)
+            if token in ids:
+                parts.append(("id", ids[token]))
+            elif token in clusters:
+                parts.append(("cluster", clusters[token]))
+            elif html.startswith('<div class="gs_rs">', m.start() - len('<div class="gs_rs">')):
+                parts.append(("snippet",))
+            else:
+                parts.append(("title",))
+            pos = m.end()
+        parts.append(html[pos:])
+        return parts
+
+    def render(self, query: str, start: int) -> str:
+        page = start // 10
+        if page < self.depth:
+            template = self.full
+        elif page == self.depth:
+            template = self.short
+        else:
+            return self.empty
+
+        seed = int.from_bytes(hashlib.blake2b(f"{query}|{start}".encode(), digest_size=8).digest(), "big")
+        rng = random.Random(seed)
+        ids, clusters = {}, {}
+        out = []
+        for part in template:
+            if isinstance(part, str):
+                out.append(part)
+            elif part[0] == "id":
+                if part[1] not in ids:
+                    ids[part[1]] = "".join(rng.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=12))
+                out.append(ids[part[1]])
+            elif part[0] == "cluster":
+                if part[1] not in clusters:
+                    clusters[part[1]] = str(rng.getrandbits(63))
+                out.append(clusters[part[1]])
+            elif part[0] == "title":
+                out.append(" ".join(rng.choices(VOCAB, k=rng.randint(6, 12))).capitalize())
+            else:
+                out.append(" ".join(rng.choices(VOCAB, k=30)) + " …")
+        return "".join(out)
+
+
+class StubScholar:
+    """
+    ThreadingHTTPServer on a background thread. Each request sleeps latency_ms (±50%)
+    and then fails with 503 (error_rate) or 429 (block_rate), or serves the page.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0, error_rate: float = 0,
+                 block_rate: float = 0, depth: int = 2):
+        self.pages = StubPages(depth)
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.block_rate = block_rate
+        self.requests = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # Keep-alive, like the real site
+
+            def do_GET(self):
+                stub.requests += 1
+                if stub.latency_ms:
+                    time.sleep(stub.latency_ms * random.uniform(0.5, 1.5) / 1000)
+                roll = random.random()
+                if roll < stub.error_rate:
+                    return self._send(503, "<html><body>Service Unavailable</body></html>")
+                if roll < stub.error_rate + stub.block_rate:
+                    return self._send(429, "<html><body>Too Many Requests</body></html>")
+
+                url = urlsplit(self.path)
+                if url.path != "/scholar":
+                    return self._send(404, "<html><body>Not Found</body></html>")
+                params = parse_qs(url.query)
+                query = (params.get("q") or params.get("as_q") or params.get("cites") or [""])[0]
+                start = int((params.get("start") or ["0"])[0])
+                self._send(200, stub.pages.render(query, start))
+
+            def _send(self, status, body):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=UTF-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=150)
+    ap.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    ap.add_argument("--block-rate", type=float, default=0.0, help="share of requests answered with 429")
+    ap.add_argument("--depth", type=int, default=2, help="full result pages per query")
+    args = ap.parse_args()
+
+    stub = StubScholar(args.host, args.port, args.latency_ms, args.error_rate, args.block_rate, args.depth)
+    print(f"Serving fixtures at {stub.base_url}/scholar (Ctrl+C to stop)")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,161 @@
+import argparse
+import csv
+import json
+import os
 import sqlite3
-import pandas as pd
-from rich import _console
+from rich import print as rprint
+from config.settings import DB_NAME
 
-def export_to_csv(db_path="scholar_data.db", output_file="my_papers.csv"):
+EXPORT_STATE_FILE = "export_state.json"   # Last exported paper id per filter set (incremental exports)
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+
+
+def _build_query(keyword=None, year_from=None, year_to=None, since=None, after_id=0):
+    clauses, params = ["id > ?"], [after_id]
+    if keyword:
+        clauses.append("keyword_source LIKE ?")
+        params.append(f"%{keyword}%")
+    if year_from:
+        clauses.append("year >= ?")
+        params.append(int(year_from))
+    if year_to:
+        clauses.append("year <= ?")
+        params.append(int(year_to))
+    if since:
+        clauses.append("scraped_at >= ?")
+        params.append(since)
+    # Ordered by id so incremental runs can resume from the last exported row
+    return f"SELECT * FROM papers WHERE {' AND '.join(clauses)} ORDER BY id", params
+
+
+class _CsvSink:
+    def __init__(self, path, columns):
+        self.f = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.f)
+        self.writer.writerow(columns)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.f.close()
+
+
+class _JsonlSink:
+    def __init__(self, path, columns):
+        self.f = open(path, "w", encoding="utf-8")
+        self.columns = columns
+
+    def write(self, rows):
+        self.f.writelines(json.dumps(dict(zip(self.columns, row)), ensure_ascii=False) + "\n" for row in rows)
+
+    def close(self):
+        self.f.close()
+
+
+class _ParquetSink:
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        self.pa = pa
+        self.columns = columns
+        self.schema = pa.schema([(c, pa.int64() if c in ("id", "year") else pa.string()) for c in columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows):
+        cols = list(zip(*rows))
+        arrays = [
+            self.pa.array(col if field.type == self.pa.int64() else [None if v is None else str(v) for v in col],
+                          type=field.type)
+            for col, field in zip(cols, self.schema)
+        ]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+SINKS = {"csv": _CsvSink, "jsonl": _JsonlSink, "parquet": _ParquetSink}
+
+
+def _load_state():
+    if not os.path.exists(EXPORT_STATE_FILE):
+        return {}
+    try:
+        with open(EXPORT_STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(state):
+    with open(EXPORT_STATE_FILE, "w") as f:
+        json.dump(state, f, indent=4)
+
+
+def export_papers(db_path=DB_NAME, output_file=None, fmt="csv", keyword=None, year_from=None, year_to=None,
+                  since=None, incremental=False, chunk_size=5000):
+    """
+    Streams the papers table to CSV / JSONL / Parquet in chunks of chunk_size rows.
+    With incremental=True only rows added since the last incremental export with the
+    same filters are written. Returns the number of rows exported.
+    """
+    if fmt not in SINKS:
+        raise ValueError(f"Unknown export format '{fmt}' (choose from {', '.join(EXPORT_FORMATS)})")
+    output_file = output_file or f"my_papers.{fmt}"
+
+    state_key = json.dumps({"keyword": keyword, "year_from": year_from, "year_to": year_to, "since": since},
+                           sort_keys=True)
+    state = _load_state() if incremental else {}
+    after_id = state.get(state_key, 0)
+
+    sql, params = _build_query(keyword, year_from, year_to, since, after_id)
     conn = sqlite3.connect(db_path)
+    sink = None
+    exported, last_id = 0, after_id
+    try:
+        cursor = conn.execute(sql, params)
+        columns = [d[0] for d in cursor.description]
+        sink = SINKS[fmt](output_file, columns)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            sink.write(rows)
+            exported += len(rows)
+            last_id = rows[-1][0]
+    finally:
+        if sink:
+            sink.close()
+        conn.close()
+
+    if incremental:
+        state[state_key] = last_id
+        _save_state(state)
+
+    rprint(f"\n[bold green]Exported {exported} papers to '{output_file}'")
+    return exported
+
 
-    df = pd.read_sql_query("SELECT * FROM papers", conn)
+def export_to_csv(db_path=DB_NAME, output_file="my_papers.csv"):
+    return export_papers(db_path, output_file, fmt="csv")
 
-    print(df.head(10))
 
-    df.to_csv(output_file, index=False)
-    _console.print(f"\n[bold green]Exported data to '{output_file}'")
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Stream the papers table to CSV, JSONL or Parquet.")
+    ap.add_argument("--db", default=DB_NAME)
+    ap.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    ap.add_argument("-o", "--output", help="output file (default: my_papers.<format>)")
+    ap.add_argument("--keyword", help="only papers whose keyword_source contains this text")
+    ap.add_argument("--year-from", type=int)
+    ap.add_argument("--year-to", type=int)
+    ap.add_argument("--since", help="only papers scraped at/after this time, e.g. 2026-01-31")
+    ap.add_argument("--incremental", action="store_true", help="only rows added since the last incremental export")
+    ap.add_argument("--chunk-size", type=int, default=5000)
+    args = ap.parse_args()
 
-    conn.close()
\ No newline at end of file
+    export_papers(args.db, args.output, args.format, args.keyword, args.year_from, args.year_to,
+                  args.since, args.incremental, args.chunk_size)
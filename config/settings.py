@@ -3,13 +3,55 @@ import os
 # --- AI CONFIG ---
 MODEL_NAME = "llama3.1" 
 LLM_KEYWORD_LIMIT = 6      # <--- How many keywords the AI should generate
-MAX_PAGES_PER_QUERY = 2    # <--- How many pages to scrape per keyword (1 page = 10 results)
+MAX_PAGES_PER_QUERY = 2    # <--- Max pages to scrape per keyword (1 page = 10 results); fewer if the query runs dry
+RESULTS_PER_PAGE = 10      # A page with fewer results is the last one for its query
+PAGINATION_MIN_NEW_RATIO = 0.2  # Stop paging a query once fewer than this share of a page's papers are new
+REFRESH_MAX_PAGES = 5      # Page cap per query in refresh mode (it normally stops at the first all-known page)
+CITATION_DEPTH = 0         # Also crawl the "Cited by" lists of harvested papers, this many hops out (0 = off)
+CITATION_PAGES = 1         # Pages per cited-by list (most-cited papers on a page are expanded first)
+CITATION_BUDGET = 100      # Max cited-by lists one run of one process adds to the frontier
+PLAN_CACHE_TTL_DAYS = 30   # Reuse a topic's generated queries for this long
+LLM_CONCURRENCY = 2        # Parallel model calls when expanding many topics
 
 # --- SCRAPER CONFIG ---
+SCHOLAR_BASE_URL = os.environ.get("SCHOLAR_BASE_URL", "https://scholar.google.com")  # Override to crawl a local stand-in
 CONCURRENT_TABS = 2        # How many browser tabs to open at once
 Global_TIMEOUT = 30000     # 30 seconds for page loads
 Human_DELAY_MIN = 2        # Min seconds to wait between actions
 Human_DELAY_MAX = 5        # Max seconds to wait
+HEADLESS = False           # Run Chromium without a visible window
+FETCH_MODE = "auto"        # "auto" (plain HTTP, browser only when that fails), "http" or "browser"
+HTTP_TIMEOUT = 20          # Seconds per plain-HTTP request
+HTTP_MAX_CONNECTIONS = 10  # Keep-alive pool size of the HTTP client
+PAGE_MAX_USES = 20         # Recycle a pooled tab (fresh context) after this many page loads
+REQUESTS_PER_MINUTE = 20   # Global polite rate across all tabs (token bucket)
+MIN_REQUESTS_PER_MINUTE = 2  # Floor the rate backs off to after repeated errors
+REQUEST_BURST = 2          # Requests allowed back-to-back before pacing kicks in
+RETRY_BASE_DELAY = 5       # Seconds; failed jobs retry after a jittered exponential backoff
+RETRY_MAX_DELAY = 120      # Cap on a single retry delay
+PARSER_BACKEND = "auto"    # "auto", "selectolax", "lxml" or "bs4" (auto = fastest installed)
+PARSE_EXECUTOR = "process" # Where HTML parsing runs: "process", "thread" or "inline" (on the event loop)
+PARSE_WORKERS = 2          # Size of the parse pool
+PIPELINE_QUEUE_SIZE = 8    # Pages buffered between pipeline stages (fetch -> parse -> save); fetchers wait when full
+
+# --- HTML CACHE CONFIG ---
+CACHE_ENABLED = True       # Serve repeat fetches of the same URL from disk
+CACHE_DIR = "html_cache"   # Compressed raw pages (zstd if installed, else gzip)
+CACHE_TTL_HOURS = 24       # Older pages are re-fetched (replay still uses them)
+CACHE_MAX_MB = 500         # Least-recently-used pages are evicted past this size
 
 # --- DATABASE CONFIG ---
-DB_NAME = "scholar_data.db"
\ No newline at end of file
+DB_NAME = "scholar_data.db"
+DB_BACKGROUND_WRITER = True  # Funnel page writes through one writer task (one commit per burst)
+DB_WRITER_MAX_BATCH = 64   # Max queued pages folded into one writer commit
+JOB_MAX_ATTEMPTS = 3       # Fetch attempts per (query, page, filters) job before it is marked failed
+JOB_STORE = "sqlite"       # Crawl frontier: "sqlite" (crawl_jobs in DB_NAME, one host) or "package.module:Class"
+JOB_LEASE_SECONDS = 120    # A leased job goes back to the frontier if its worker stops heartbeating this long
+JOB_POLL_SECONDS = 2       # Idle workers re-check a frontier other processes may be filling this often
+WORKER_PROCESSES = 2       # Default for `main.py worker --processes`
+DEDUP_ENABLED = True       # Catch the same paper under different URLs (publisher / PDF mirror / arXiv)
+DEDUP_THRESHOLD = 0.7      # Min estimated Jaccard similarity (MinHash over title + snippet) for a near-duplicate
+
+# --- METRICS CONFIG ---
+METRICS_ENABLED = True     # Per-stage timers (a perf_counter pair per stage; safe to leave on)
+METRICS_FILE = "run_metrics.jsonl"  # One JSON summary line appended per crawl
@@ -1,49 +1,665 @@
+import asyncio
+import json
+import time
 import aiosqlite
-from config.settings import DB_NAME
+from config.settings import DB_NAME, DB_BACKGROUND_WRITER, DB_WRITER_MAX_BATCH
 from rich import print as rprint
+from core.metrics import metrics
+from scraper.parser import Paper
+
+# Schema upgrades, applied in order and tracked with PRAGMA user_version
+SCHEMA_V1_READ_LAYER = """
+    CREATE INDEX IF NOT EXISTS idx_papers_keyword ON papers (keyword_source);
+    CREATE INDEX IF NOT EXISTS idx_papers_year ON papers (year);
+    CREATE INDEX IF NOT EXISTS idx_papers_scraped_at ON papers (scraped_at);
+
+    -- Row count kept current by triggers, so stats never scan the table
+    CREATE TABLE IF NOT EXISTS paper_stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+    INSERT OR REPLACE INTO paper_stats (name, value) SELECT 'papers', COUNT(*) FROM papers;
+    CREATE TRIGGER IF NOT EXISTS papers_count_ins AFTER INSERT ON papers BEGIN
+        UPDATE paper_stats SET value = value + 1 WHERE name = 'papers';
+    END;
+    CREATE TRIGGER IF NOT EXISTS papers_count_del AFTER DELETE ON papers BEGIN
+        UPDATE paper_stats SET value = value - 1 WHERE name = 'papers';
+    END;
+
+    -- Full-text index over title + snippet (external content: no duplicated text)
+    CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+        title, snippet, content='papers', content_rowid='id'
+    );
+    INSERT INTO papers_fts (papers_fts) VALUES ('rebuild');
+    CREATE TRIGGER IF NOT EXISTS papers_fts_ins AFTER INSERT ON papers BEGIN
+        INSERT INTO papers_fts (rowid, title, snippet) VALUES (new.id, new.title, new.snippet);
+    END;
+    CREATE TRIGGER IF NOT EXISTS papers_fts_del AFTER DELETE ON papers BEGIN
+        INSERT INTO papers_fts (papers_fts, rowid, title, snippet) VALUES ('delete', old.id, old.title, old.snippet);
+    END;
+    CREATE TRIGGER IF NOT EXISTS papers_fts_upd AFTER UPDATE OF title, snippet ON papers BEGIN
+        INSERT INTO papers_fts (papers_fts, rowid, title, snippet) VALUES ('delete', old.id, old.title, old.snippet);
+        INSERT INTO papers_fts (rowid, title, snippet) VALUES (new.id, new.title, new.snippet);
+    END;
+"""
+
+# Older databases stored year as TEXT with "Unknown"; rebuild it as a nullable INTEGER
+REBUILD_PAPERS_YEAR_INT = """
+    CREATE TABLE papers_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        url TEXT UNIQUE,
+        snippet TEXT,
+        keyword_source TEXT,
+        year INTEGER,
+        scraped_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    INSERT INTO papers_new (id, title, url, snippet, keyword_source, year, scraped_at)
+        SELECT id, title, url, snippet, keyword_source,
+               CASE WHEN year GLOB '[0-9][0-9][0-9][0-9]' THEN CAST(year AS INTEGER) END,
+               scraped_at
+        FROM papers;
+    DROP TABLE papers;
+    ALTER TABLE papers_new RENAME TO papers;
+"""
+
+# Near-duplicate papers reached through another URL (PDF mirror, arXiv, publisher)
+SCHEMA_V2_ALIASES = """
+    CREATE TABLE IF NOT EXISTS paper_aliases (
+        url TEXT PRIMARY KEY,
+        paper_id INTEGER NOT NULL REFERENCES papers (id),
+        similarity REAL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_paper_aliases_paper ON paper_aliases (paper_id);
+"""
+
+# Retry backoff: a pending job is not leased before available_at (unix time)
+SCHEMA_V3_JOB_BACKOFF = """
+    ALTER TABLE crawl_jobs ADD COLUMN available_at REAL NOT NULL DEFAULT 0;
+"""
+
+# Leases: in-flight jobs belong to one worker process until lease_expires (unix time), renewed by heartbeats
+SCHEMA_V4_JOB_LEASES = """
+    ALTER TABLE crawl_jobs ADD COLUMN leased_by TEXT;
+    ALTER TABLE crawl_jobs ADD COLUMN lease_expires REAL;
+"""
+
+# Richer extraction: .gs_a authors / venue / host and the .gs_fl footer (cited-by count, cluster id).
+# Authors and venues are normalized into side tables; citations links clusters found by cited-by expansion.
+SCHEMA_V5_CITATIONS = """
+    CREATE TABLE IF NOT EXISTS venues (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS authors (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS paper_authors (
+        paper_id INTEGER NOT NULL REFERENCES papers (id),
+        position INTEGER NOT NULL,
+        author_id INTEGER NOT NULL REFERENCES authors (id),
+        PRIMARY KEY (paper_id, position)
+    );
+    CREATE INDEX IF NOT EXISTS idx_paper_authors_author ON paper_authors (author_id);
+
+    ALTER TABLE papers ADD COLUMN cluster_id TEXT;
+    ALTER TABLE papers ADD COLUMN cited_by INTEGER;
+    ALTER TABLE papers ADD COLUMN publisher TEXT;
+    ALTER TABLE papers ADD COLUMN venue_id INTEGER REFERENCES venues (id);
+    -- One row per cluster: a second URL for a known cluster is the same paper
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_papers_cluster ON papers (cluster_id);
+    CREATE INDEX IF NOT EXISTS idx_papers_venue ON papers (venue_id);
+
+    -- citing_cluster appeared on the "Cited by" list of cited_cluster
+    CREATE TABLE IF NOT EXISTS citations (
+        cited_cluster TEXT NOT NULL,
+        citing_cluster TEXT NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (cited_cluster, citing_cluster)
+    );
+    CREATE INDEX IF NOT EXISTS idx_citations_citing ON citations (citing_cluster);
+"""
+
+SCHEMA_VERSION = 5
+
+INSERT_PAPER_SQL = """
+    INSERT OR IGNORE INTO papers (title, url, snippet, keyword_source, year, cluster_id, cited_by, publisher, venue_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, (SELECT id FROM venues WHERE name = ?))
+"""
 
 class ResearchDatabase:
-    def __init__(self):
-        self.db_path = DB_NAME
+    def __init__(self, db_path: str = DB_NAME, max_batch: int = DB_WRITER_MAX_BATCH):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self._conn = None
+        self._write_lock = asyncio.Lock()
+        self._write_queue = None
+        self._writer_task = None
+
+    async def connect(self):
+        """Opens the single long-lived connection and applies the tuned pragmas."""
+        if self._conn:
+            return self._conn
+        self._conn = await aiosqlite.connect(self.db_path)
+        await self._conn.execute("PRAGMA journal_mode=WAL")
+        await self._conn.execute("PRAGMA synchronous=NORMAL")
+        await self._conn.execute("PRAGMA temp_store=MEMORY")
+        await self._conn.execute("PRAGMA cache_size=-20000")   # ~20 MB page cache
+        await self._conn.execute("PRAGMA busy_timeout=5000")
+        return self._conn
+
+    async def close(self):
+        """Flushes the background writer (if any) and closes the connection."""
+        await self.stop_writer()
+        if self._conn:
+            await self._conn.close()
+            self._conn = None
 
     async def init_db(self):
         """Creates the tables if they don't exist."""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS papers (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    url TEXT UNIQUE,
-                    snippet TEXT,
-                    keyword_source TEXT,
-                    year TEXT,
-                    scraped_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            await db.commit()
+        db = await self.connect()
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS papers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                url TEXT UNIQUE,
+                snippet TEXT,
+                keyword_source TEXT,
+                year INTEGER,
+                scraped_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                filters TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (query, page, filters)
+            )
+        """)
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_crawl_jobs_state ON crawl_jobs (state, id)")
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS search_plans (
+                cache_key TEXT PRIMARY KEY,
+                topic TEXT NOT NULL,
+                queries TEXT NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        await db.commit()
+        await self._migrate(db)
 
-    async def save_paper(self, paper_data: dict):
-        """Saves a single paper, ignoring duplicates (based on URL)."""
-        async with aiosqlite.connect(self.db_path) as db:
+    async def _migrate(self, db):
+        async with db.execute("PRAGMA user_version") as cursor:
+            version = (await cursor.fetchone())[0]
+        if version >= SCHEMA_VERSION:
+            return
+
+        rprint("[yellow]Upgrading database schema...[/yellow]")
+        if version < 1:
+            async with db.execute("SELECT type FROM pragma_table_info('papers') WHERE name = 'year'") as cursor:
+                year_type = (await cursor.fetchone())[0]
+            script = SCHEMA_V1_READ_LAYER
+            if year_type.upper() != "INTEGER":
+                script = REBUILD_PAPERS_YEAR_INT + script
+            await db.executescript(f"BEGIN; {script} PRAGMA user_version = 1; COMMIT;")
+        if version < 2:
+            await db.executescript(f"BEGIN; {SCHEMA_V2_ALIASES} PRAGMA user_version = 2; COMMIT;")
+        if version < 3:
+            await db.executescript(f"BEGIN; {SCHEMA_V3_JOB_BACKOFF} PRAGMA user_version = 3; COMMIT;")
+        if version < 4:
+            await db.executescript(f"BEGIN; {SCHEMA_V4_JOB_LEASES} PRAGMA user_version = 4; COMMIT;")
+        if version < 5:
+            await db.executescript(f"BEGIN; {SCHEMA_V5_CITATIONS} PRAGMA user_version = 5; COMMIT;")
+
+    @staticmethod
+    def _paper_row(p):
+        return (p.title, p.url, p.snippet, p.keyword, p.year, p.cluster_id, p.cited_by, p.publisher, p.venue)
+
+    async def _insert_page(self, db, papers: list, citations: list = ()) -> int:
+        """
+        Writes one page inside the caller's transaction: venues and authors first (so the
+        paper rows can point at them), then the papers, their author lists and the page's
+        citation edges. Returns how many papers were new.
+        """
+        # Paper records from the parser; dicts (save_paper, parse_html output) are converted
+        papers = [p if isinstance(p, tuple) else Paper(**p) for p in papers]
+        venues = {p.venue for p in papers if p.venue}
+        if venues:
+            await db.executemany("INSERT OR IGNORE INTO venues (name) VALUES (?)", [(v,) for v in venues])
+        # Rows with neither URL nor cluster id can't be found again afterwards: insert them one by one
+        keyed = [p for p in papers if p.url or p.cluster_id]
+        cursor = await db.executemany(INSERT_PAPER_SQL, [self._paper_row(p) for p in keyed])
+        added = max(cursor.rowcount, 0)
+        paper_ids = {}
+        for p in papers:
+            if not (p.url or p.cluster_id):
+                cursor = await db.execute(INSERT_PAPER_SQL, self._paper_row(p))
+                if cursor.rowcount > 0:
+                    added += 1
+                    paper_ids[id(p)] = cursor.lastrowid
+
+        authors = {name for p in papers for name in p.authors}
+        if authors:
+            await db.executemany("INSERT OR IGNORE INTO authors (name) VALUES (?)", [(name,) for name in authors])
+            # Citation-only results have no URL, so those are matched on their cluster id
+            await db.executemany("""
+                INSERT OR IGNORE INTO paper_authors (paper_id, position, author_id)
+                SELECT p.id, ?, a.id FROM papers p, authors a WHERE p.url = ? AND a.name = ?
+            """, [(pos, p.url, name) for p in papers if p.url for pos, name in enumerate(p.authors)])
+            await db.executemany("""
+                INSERT OR IGNORE INTO paper_authors (paper_id, position, author_id)
+                SELECT p.id, ?, a.id FROM papers p, authors a WHERE p.cluster_id = ? AND a.name = ?
+            """, [(pos, p.cluster_id, name) for p in papers if not p.url and p.cluster_id
+                  for pos, name in enumerate(p.authors)])
+            await db.executemany("""
+                INSERT OR IGNORE INTO paper_authors (paper_id, position, author_id)
+                SELECT ?, ?, id FROM authors WHERE name = ?
+            """, [(paper_ids[id(p)], pos, name) for p in papers if id(p) in paper_ids
+                  for pos, name in enumerate(p.authors)])
+        if citations:
+            await db.executemany(
+                "INSERT OR IGNORE INTO citations (cited_cluster, citing_cluster) VALUES (?, ?)", citations
+            )
+        return added
+
+    async def save_papers(self, papers: list, citations: list = ()) -> int:
+        """
+        Bulk-inserts a batch in one transaction. Returns how many rows were actually new.
+        A DB error rolls the batch back and is raised, so the caller can retry the page.
+        """
+        if not papers and not citations:
+            return 0
+        db = await self.connect()
+        async with self._write_lock:
             try:
-                await db.execute("""
-                    INSERT OR IGNORE INTO papers (title, url, snippet, keyword_source, year)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    paper_data['title'],
-                    paper_data['url'],
-                    paper_data['snippet'],
-                    paper_data['keyword'],
-                    paper_data['year']
-                ))
+                # rowcount sums real modifications, so rows skipped by OR IGNORE don't count
+                added = await self._insert_page(db, papers, citations)
                 await db.commit()
-                return True
+                return added
+            except BaseException:
+                await db.rollback()
+                raise
+
+    async def save_paper(self, paper_data: dict):
+        """Saves a single paper, ignoring duplicates (based on URL). Returns True only if it was new."""
+        return await self.save_papers([paper_data]) == 1
+
+    async def save_aliases(self, aliases: list) -> int:
+        """Records [(alias_url, canonical_url, similarity), ...] against the canonical paper's id."""
+        if not aliases:
+            return 0
+        db = await self.connect()
+        async with self._write_lock:
+            cursor = await db.executemany("""
+                INSERT OR IGNORE INTO paper_aliases (url, paper_id, similarity)
+                SELECT ?, id, ? FROM papers WHERE url = ?
+            """, [(alias, sim, canonical) for alias, canonical, sim in aliases])
+            await db.commit()
+            return max(cursor.rowcount, 0)
+
+    async def iter_dedup_corpus(self, batch_size: int = 10000):
+        """Yields batches of (url, title, snippet, cluster_id) for every stored paper, oldest first (dedup warm-up)."""
+        db = await self.connect()
+        async with db.execute(
+            "SELECT url, title, snippet, cluster_id FROM papers WHERE url IS NOT NULL ORDER BY id"
+        ) as cursor:
+            while True:
+                rows = await cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+
+    async def expanded_clusters(self) -> set:
+        """
+        Clusters whose "Cited by" list is queued, being crawled or done (see ScholarEngine.citation_jobs).
+        Failed lists are left out so they can be queued again.
+        """
+        db = await self.connect()
+        async with db.execute("""
+            SELECT json_extract(payload, '$.cites') FROM crawl_jobs
+            WHERE state IN ('pending', 'in_flight', 'done') AND json_extract(payload, '$.cites') IS NOT NULL
+            UNION SELECT cited_cluster FROM citations
+        """) as cursor:
+            return {row[0] for row in await cursor.fetchall()}
+
+    # --- BACKGROUND WRITER ---
+    def start_writer(self):
+        """Starts a task that drains queued pages and commits them together."""
+        if self._writer_task:
+            return
+        self._write_queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer_loop())
+
+    async def stop_writer(self):
+        if not self._writer_task:
+            return
+        await self._write_queue.join()
+        self._writer_task.cancel()
+        try:
+            await self._writer_task
+        except asyncio.CancelledError:
+            pass
+        self._writer_task = None
+        self._write_queue = None
+
+    async def queue_papers(self, papers: list, citations: list = ()) -> int:
+        """
+        Hands a parsed page to the writer and waits for its new-row count. Raises if the write failed.
+        citations holds the page's (cited_cluster, citing_cluster) edges, written in the same commit.
+        """
+        if not papers and not citations:
+            return 0
+        with metrics.timer("db_write"):
+            if not DB_BACKGROUND_WRITER or not self._writer_task:
+                return await self.save_papers(papers, citations)
+            future = asyncio.get_running_loop().create_future()
+            self._write_queue.put_nowait((papers, citations, future))
+            return await future
+
+    async def _writer_loop(self):
+        while True:
+            pending = [await self._write_queue.get()]
+            # Grab whatever else piled up while we were waiting, one commit for all of it
+            while not self._write_queue.empty() and len(pending) < self.max_batch:
+                pending.append(self._write_queue.get_nowait())
+
+            # Whatever goes wrong, every waiting queue_papers gets an answer and the writer keeps running
+            try:
+                counts = await self._write_batch(pending)
             except Exception as e:
                 rprint(f"[red]DB Error:[/red] {e}")
-                return False
+                for _, _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, _, future), count in zip(pending, counts):
+                    if not future.done():
+                        future.set_result(count)
+            finally:
+                for _ in pending:
+                    self._write_queue.task_done()
+
+    async def _write_batch(self, pending: list) -> list:
+        """Writes queued pages in one commit (rolled back as a whole on error). Returns their new-row counts."""
+        db = await self.connect()
+        async with self._write_lock:
+            started = time.perf_counter()
+            try:
+                counts = [await self._insert_page(db, papers, citations) for papers, citations, _ in pending]
+                await db.commit()
+                return counts
+            except BaseException:
+                await db.rollback()
+                raise
+            finally:
+                metrics.record("db_commit", time.perf_counter() - started)
+
+    # --- CRAWL FRONTIER ---
+    # Job states: pending -> in_flight -> done | failed (back to pending while attempts remain)
+    # Leases are taken with single UPDATE ... RETURNING statements, so several processes can share the table.
+    @staticmethod
+    def _job_filters(job: dict) -> str:
+        """Canonical form of everything besides (query, page) that changes the fetched URL."""
+        if job.get("cites"):
+            # A cited-by list (see ScholarEngine.citation_jobs) is the same list whoever found the cluster
+            return json.dumps({"cites": job["cites"]})
+        filters = {
+            "years": job.get("years") or {},
+            "advanced_params": job.get("advanced_params") or {},
+            "prefs": job.get("prefs") or {}
+        }
+        if job.get("refresh"):
+            # One refresh per query per day; only added when set so older job keys stay unchanged
+            filters["refresh"] = job["refresh"]
+        return json.dumps(filters, sort_keys=True)
+
+    async def enqueue_jobs(self, jobs: list) -> int:
+        """Adds jobs to the frontier. Done jobs are skipped, failed ones get a fresh start. Returns rows touched."""
+        if not jobs:
+            return 0
+        db = await self.connect()
+        async with self._write_lock:
+            added = await self._insert_jobs(db, jobs)
+            await db.commit()
+            return len(added)
+
+    async def _insert_jobs(self, db, jobs: list) -> list:
+        """Inserts (or revives failed) jobs; returns the ones that were actually queued."""
+        added = []
+        for job in jobs:
+            cursor = await db.execute("""
+                INSERT INTO crawl_jobs (query, page, filters, payload) VALUES (?, ?, ?, ?)
+                ON CONFLICT (query, page, filters) DO UPDATE
+                    SET state = 'pending', attempts = 0, available_at = 0, updated_at = CURRENT_TIMESTAMP
+                    WHERE state = 'failed'
+            """, (job.get('query', 'Advanced Search'), job['page'], self._job_filters(job), json.dumps(job)))
+            if cursor.rowcount > 0:
+                added.append(job)
+        return added
+
+    async def lease_job(self, worker_id: str = None, lease_seconds: float = 0):
+        """
+        Claims the oldest pending job whose backoff has elapsed, or an in-flight job whose
+        lease ran out (its worker died). Returns (job_id, job_dict, attempt_number) or None.
+        """
+        db = await self.connect()
+        now = time.time()
+        async with self._write_lock:
+            async with db.execute("""
+                UPDATE crawl_jobs
+                SET state = 'in_flight', attempts = attempts + 1, leased_by = ?, lease_expires = ?,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = (
+                    SELECT id FROM crawl_jobs
+                    WHERE (state = 'pending' AND available_at <= ?)
+                       OR (state = 'in_flight' AND lease_expires < ?)
+                    ORDER BY id LIMIT 1
+                )
+                RETURNING id, payload, attempts
+            """, (worker_id, now + lease_seconds if lease_seconds else None, now, now)) as cursor:
+                row = await cursor.fetchone()
+            await db.commit()
+            if not row:
+                return None
+            return row[0], json.loads(row[1]), row[2]
+
+    async def heartbeat_jobs(self, worker_id: str, job_ids: list, lease_seconds: float) -> int:
+        """
+        Extends worker_id's leases on job_ids. Returns how many it still holds.
+        Only the jobs a worker is actually running are renewed: one whose completion couldn't
+        be written is left to expire and go back to the frontier.
+        """
+        if not job_ids:
+            return 0
+        db = await self.connect()
+        async with self._write_lock:
+            cursor = await db.executemany(
+                "UPDATE crawl_jobs SET lease_expires = ? WHERE id = ? AND state = 'in_flight' AND leased_by = ?",
+                [(time.time() + lease_seconds, job_id, worker_id) for job_id in job_ids]
+            )
+            await db.commit()
+            return max(cursor.rowcount, 0)
+
+    async def next_job_time(self):
+        """
+        Unix time the next job could become leasable (a backed-off retry, or a lease that
+        may expire), or None when nothing is pending and no lease is out.
+        """
+        db = await self.connect()
+        async with db.execute("""
+            SELECT MIN(CASE WHEN state = 'pending' THEN available_at ELSE lease_expires END)
+            FROM crawl_jobs WHERE state IN ('pending', 'in_flight')
+        """) as cursor:
+            return (await cursor.fetchone())[0]
+
+    async def complete_job(self, job_id: int, follow_ups: list = ()) -> list:
+        """Marks the job done and enqueues its follow-up jobs in the same commit. Returns the ones that were added."""
+        if not follow_ups:
+            await self._set_job_state(job_id, 'done')
+            return []
+        db = await self.connect()
+        async with self._write_lock:
+            added = await self._insert_jobs(db, follow_ups)
+            await db.execute(
+                "UPDATE crawl_jobs SET state = 'done', leased_by = NULL, lease_expires = NULL, "
+                "updated_at = CURRENT_TIMESTAMP WHERE id = ?", (job_id,)
+            )
+            await db.commit()
+            return added
+
+    async def fail_job(self, job_id: int, error: str, max_attempts: int, retry_delay: float = 0) -> str:
+        """Puts the job back to pending (ready after retry_delay seconds) while it has attempts left. Returns the new state."""
+        db = await self.connect()
+        async with self._write_lock:
+            await db.execute("""
+                UPDATE crawl_jobs
+                SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    available_at = ?, last_error = ?, leased_by = NULL, lease_expires = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (max_attempts, time.time() + retry_delay, error, job_id))
+            await db.commit()
+            async with db.execute("SELECT state FROM crawl_jobs WHERE id = ?", (job_id,)) as cursor:
+                return (await cursor.fetchone())[0]
+
+    async def _set_job_state(self, job_id: int, state: str):
+        db = await self.connect()
+        async with self._write_lock:
+            await db.execute(
+                "UPDATE crawl_jobs SET state = ?, leased_by = NULL, lease_expires = NULL, updated_at = CURRENT_TIMESTAMP "
+                "WHERE id = ?", (state, job_id)
+            )
+            await db.commit()
+
+    async def recover_jobs(self) -> int:
+        """
+        Jobs left in flight by a crash or Ctrl-C go back to pending. Returns how many.
+        Only for single-process runs; shared frontiers rely on lease expiry instead.
+        """
+        db = await self.connect()
+        async with self._write_lock:
+            cursor = await db.execute("""
+                UPDATE crawl_jobs SET state = 'pending', leased_by = NULL, lease_expires = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE state = 'in_flight'
+            """)
+            await db.commit()
+            return cursor.rowcount
+
+    async def count_jobs(self, state: str = 'pending') -> int:
+        db = await self.connect()
+        async with db.execute("SELECT COUNT(*) FROM crawl_jobs WHERE state = ?", (state,)) as cursor:
+            return (await cursor.fetchone())[0]
+
+    async def tracked_queries(self) -> list:
+        """
+        Every standard query we have crawled, as {"query", "last_crawled", "years", "prefs"}.
+        Queries come from finished page-1 jobs and from papers.keyword_source (older crawls);
+        last_crawled is the latest of the two ("YYYY-MM-DD HH:MM:SS", UTC).
+        Advanced searches and cited-by lists are left out.
+        """
+        db = await self.connect()
+        tracked = {}
+        async with db.execute("""
+            SELECT keyword_source, MAX(scraped_at) FROM papers
+            WHERE keyword_source IS NOT NULL AND keyword_source NOT IN ('Advanced Search', 'Cited by')
+            GROUP BY keyword_source
+        """) as cursor:
+            async for query, last in cursor:
+                tracked[query] = {"query": query, "last_crawled": last, "years": {}, "prefs": None}
+        async with db.execute("""
+            SELECT query, payload, updated_at FROM crawl_jobs
+            WHERE state = 'done' AND page = 1 AND query NOT IN ('Advanced Search', 'Cited by')
+            ORDER BY id
+        """) as cursor:
+            async for query, payload, updated_at in cursor:
+                job = json.loads(payload)
+                if job.get("advanced_params") or job.get("cites"):
+                    continue
+                entry = tracked.setdefault(query, {"query": query, "last_crawled": updated_at, "years": {}, "prefs": None})
+                entry["last_crawled"] = max(entry["last_crawled"] or "", updated_at or "")
+                if entry["prefs"] is None and not job.get("refresh"):
+                    # The first regular crawl's filters are the ones the user asked for
+                    entry["years"] = job.get("years") or {}
+                    entry["prefs"] = job.get("prefs")
+        return list(tracked.values())
+
+    # --- SEARCH PLAN CACHE ---
+    async def get_search_plan(self, cache_key: str, max_age_days: float):
+        """Cached LLM queries for this key, or None if missing or older than max_age_days."""
+        db = await self.connect()
+        async with db.execute(
+            "SELECT queries FROM search_plans WHERE cache_key = ? AND created_at >= datetime('now', ?)",
+            (cache_key, f"-{max_age_days} days")
+        ) as cursor:
+            row = await cursor.fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def save_search_plan(self, cache_key: str, topic: str, queries: list):
+        db = await self.connect()
+        async with self._write_lock:
+            await db.execute(
+                "INSERT OR REPLACE INTO search_plans (cache_key, topic, queries) VALUES (?, ?, ?)",
+                (cache_key, topic, json.dumps(queries))
+            )
+            await db.commit()
+
+    async def purge_search_plans(self, max_age_days: float) -> int:
+        """Deletes expired plans. Returns how many were removed."""
+        db = await self.connect()
+        async with self._write_lock:
+            cursor = await db.execute(
+                "DELETE FROM search_plans WHERE created_at < datetime('now', ?)", (f"-{max_age_days} days",)
+            )
+            await db.commit()
+            return cursor.rowcount
 
     async def get_stats(self):
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute("SELECT COUNT(*) FROM papers") as cursor:
-                count = await cursor.fetchone()
-                return count[0]
\ No newline at end of file
+        """Total papers, read from the trigger-maintained counter (no table scan)."""
+        db = await self.connect()
+        async with db.execute("SELECT value FROM paper_stats WHERE name = 'papers'") as cursor:
+            count = await cursor.fetchone()
+            return count[0] if count else 0
+
+    # --- READ API ---
+    async def _fetch_papers(self, sql: str, params: tuple) -> list:
+        db = await self.connect()
+        async with db.execute(sql, params) as cursor:
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in await cursor.fetchall()]
+
+    async def papers_by_keyword(self, keyword: str, limit: int = 50, offset: int = 0) -> list:
+        """Papers harvested for an exact keyword_source, newest first."""
+        return await self._fetch_papers(
+            "SELECT * FROM papers WHERE keyword_source = ? ORDER BY id DESC LIMIT ? OFFSET ?",
+            (keyword, limit, offset)
+        )
+
+    async def papers_by_year(self, year_from: int = None, year_to: int = None, limit: int = 50, offset: int = 0) -> list:
+        """Papers published in [year_from, year_to]; either bound may be None."""
+        return await self._fetch_papers(
+            """SELECT * FROM papers
+                WHERE year BETWEEN ? AND ? ORDER BY year DESC, id DESC LIMIT ? OFFSET ?""",
+            (year_from or 0, year_to or 9999, limit, offset)
+        )
+
+    async def recent_papers(self, limit: int = 50, offset: int = 0) -> list:
+        return await self._fetch_papers(
+            "SELECT * FROM papers ORDER BY scraped_at DESC, id DESC LIMIT ? OFFSET ?",
+            (limit, offset)
+        )
+
+    async def search_papers(self, text: str, limit: int = 50, offset: int = 0) -> list:
+        """Full-text search over title + snippet (FTS5 query syntax), best matches first."""
+        return await self._fetch_papers(
+            """SELECT p.* FROM papers_fts JOIN papers p ON p.id = papers_fts.rowid
+                WHERE papers_fts MATCH ? ORDER BY bm25(papers_fts) LIMIT ? OFFSET ?""",
+            (text, limit, offset)
+        )
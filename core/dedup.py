@@ -0,0 +1,187 @@
+import re
+import unicodedata
+import numpy as np
+from config.settings import DEDUP_THRESHOLD
+
+# MinHash / LSH shape: 8 bands x 4 rows puts the LSH S-curve midpoint near 0.6 Jaccard,
+# candidates are then verified against DEDUP_THRESHOLD on the full signature.
+NUM_PERM = 32
+BANDS = 8
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+MIN_TITLE_WORDS = 4     # Shorter titles ("Introduction", "Editorial") are too generic for exact matching
+# A title match is only an alias when the signatures agree this much too: Scholar snippets vary by
+# query, but two different papers that share a stock title ("A survey of deep learning") barely overlap
+TITLE_MATCH_MIN_SIMILARITY = 0.3
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_MARKERS = re.compile(r"\[(pdf|html|citation|book|b|c)\]", re.IGNORECASE)
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase, accent-free, punctuation-free title with Scholar's [PDF]/[HTML] markers removed."""
+    text = unicodedata.normalize("NFKD", _MARKERS.sub(" ", title or ""))
+    text = text.encode("ascii", "ignore").decode("ascii").lower()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def _shingles(title: str, snippet: str) -> list:
+    words = normalize_title(f"{title} {snippet or ''}").split()
+    if len(words) < 2:
+        return [hash(w) & 0xFFFFFFFF for w in words] or [0]
+    return [hash((a, b)) & 0xFFFFFFFF for a, b in zip(words, words[1:])]
+
+
+class PaperDeduper:
+    """
+    In-memory near-duplicate index over (title, snippet).
+
+    Three checks, all O(1) per paper regardless of index size:
+      1. Scholar cluster id (every version of a paper shares it; different ids are never merged)
+      2. exact normalized-title fingerprint (titles with MIN_TITLE_WORDS+ words), confirmed
+         by TITLE_MATCH_MIN_SIMILARITY signature agreement
+      3. MinHash signature looked up in LSH band buckets, verified on the full signature
+    The first paper seen for a title/bucket is the canonical one; later matches become aliases.
+    Papers are matched first and committed to the index only once they are stored (match / commit).
+    """
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, seed: int = 1):
+        self.threshold = threshold
+        self.rows = NUM_PERM // BANDS
+        rng = np.random.default_rng(seed)
+        # a, b < 2**32 keep a*x + b inside uint64 for 32-bit shingle hashes
+        self._a = rng.integers(1, 1 << 32, NUM_PERM, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+        self._band_mix = rng.integers(1, 1 << 63, (BANDS, self.rows), dtype=np.uint64)
+
+        self._clusters = {}               # cluster id -> canonical index
+        self._titles = {}                 # title fingerprint -> canonical index
+        self._buckets = {}                # band key -> canonical index
+        self._sigs = np.empty((1024, NUM_PERM), dtype=np.uint32)
+        self.urls = []                    # canonical index -> URL
+        self.cluster_ids = []             # canonical index -> cluster id (or None)
+
+    def __len__(self):
+        return len(self.urls)
+
+    # --- HASHING ---
+    def signatures(self, docs: list) -> np.ndarray:
+        """MinHash signatures for [(title, snippet), ...] in one vectorized pass."""
+        shingle_lists = [_shingles(t, s) for t, s in docs]
+        lengths = np.fromiter((len(x) for x in shingle_lists), dtype=np.int64, count=len(docs))
+        flat = np.fromiter((h for x in shingle_lists for h in x), dtype=np.uint64, count=int(lengths.sum()))
+        hashed = (self._a[:, None] * flat[None, :] + self._b[:, None]) % MERSENNE_PRIME & MAX_HASH
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        return np.minimum.reduceat(hashed, offsets, axis=1).T.astype(np.uint32)
+
+    def _band_keys(self, sigs: np.ndarray) -> np.ndarray:
+        bands = sigs.reshape(len(sigs), BANDS, self.rows).astype(np.uint64)
+        # Salt each band differently so equal rows in different bands don't collide
+        return (bands * self._band_mix).sum(axis=2) + np.arange(BANDS, dtype=np.uint64)
+
+    @staticmethod
+    def _title_key(title: str):
+        norm = normalize_title(title)
+        return hash(norm) if len(norm.split()) >= MIN_TITLE_WORDS else None
+
+    # --- INDEX ---
+    def _index(self):
+        return self._clusters, self._titles, self._buckets, self._sigs, self.cluster_ids
+
+    @staticmethod
+    def _staging():
+        """Same shape as _index(), for the new papers of one match() call."""
+        return {}, {}, {}, [], []
+
+    def _add(self, url: str, cluster_id, title_key, sig, band_keys) -> int:
+        idx = len(self.urls)
+        if idx == len(self._sigs):
+            self._sigs = np.resize(self._sigs, (idx * 2, NUM_PERM))
+        self._sigs[idx] = sig
+        self.urls.append(url)
+        self.cluster_ids.append(cluster_id)
+        self._register(self._index(), idx, cluster_id, title_key, band_keys)
+        return idx
+
+    @staticmethod
+    def _register(index, idx, cluster_id, title_key, band_keys):
+        clusters, titles, buckets, _, _ = index
+        if cluster_id is not None:
+            clusters.setdefault(cluster_id, idx)
+        if title_key is not None:
+            titles.setdefault(title_key, idx)
+        for key in band_keys:
+            buckets.setdefault(key, idx)
+
+    def _match(self, index, cluster_id, title_key, sig, band_keys):
+        """(position, similarity) of the best match in index, or (None, 0.0)."""
+        clusters, titles, buckets, sigs, cluster_ids = index
+        if cluster_id is not None and cluster_id in clusters:
+            return clusters[cluster_id], 1.0
+
+        def other_cluster(idx):
+            # Scholar already told us these are different papers
+            return cluster_id is not None and cluster_ids[idx] is not None
+
+        if title_key is not None and title_key in titles and not other_cluster(titles[title_key]):
+            idx = titles[title_key]
+            sim = float(np.count_nonzero(sigs[idx] == sig)) / NUM_PERM
+            if sim >= TITLE_MATCH_MIN_SIMILARITY:
+                return idx, sim
+        candidates = {buckets[k] for k in band_keys if k in buckets and not other_cluster(buckets[k])}
+        best, best_sim = None, 0.0
+        for idx in candidates:
+            sim = float(np.count_nonzero(sigs[idx] == sig)) / NUM_PERM
+            if sim > best_sim:
+                best, best_sim = idx, sim
+        return (best, best_sim) if best_sim >= self.threshold else (None, 0.0)
+
+    def warm(self, rows: list):
+        """Loads stored papers [(url, title, snippet, cluster_id), ...] without alias detection."""
+        if not rows:
+            return
+        sigs = self.signatures([(t, s) for _, t, s, _ in rows])
+        for (url, title, _, cluster_id), sig, keys in zip(rows, sigs, self._band_keys(sigs).tolist()):
+            self._add(url, cluster_id, self._title_key(title), sig, keys)
+
+    def match(self, papers: list):
+        """
+        Splits parsed Paper records into (unique, aliases, entries) without changing the index.
+        aliases holds (alias_url, canonical_url, similarity) for near-duplicates under a new URL;
+        rows whose URL is already the canonical one are plain duplicates and are dropped silently.
+        Pass entries to commit() once the unique papers are stored, so a failed write leaves
+        nothing behind that would make a retry of the page look like a duplicate.
+        """
+        if not papers:
+            return [], [], []
+        sigs = self.signatures([(p[0], p[2]) for p in papers])
+        staged, staged_urls = self._staging(), []
+        unique, aliases, entries = [], [], []
+        for paper, sig, keys in zip(papers, sigs, self._band_keys(sigs).tolist()):
+            title_key = self._title_key(paper[0])
+            idx, sim = self._match(self._index(), paper.cluster_id, title_key, sig, keys)
+            canonical = self.urls[idx] if idx is not None else None
+            if canonical is None:
+                # Earlier papers of the same batch count too
+                pos, sim = self._match(staged, paper.cluster_id, title_key, sig, keys)
+                canonical = staged_urls[pos] if pos is not None else None
+            if canonical is None:
+                self._register(staged, len(staged_urls), paper.cluster_id, title_key, keys)
+                staged[3].append(sig)
+                staged[4].append(paper.cluster_id)
+                staged_urls.append(paper[1])
+                entries.append((paper[1], paper.cluster_id, title_key, sig, keys))
+                unique.append(paper)
+            elif canonical != paper[1]:
+                aliases.append((paper[1], canonical, round(sim, 3)))
+        return unique, aliases, entries
+
+    def commit(self, entries: list):
+        """Adds the unique papers of a match() to the index (after they were written)."""
+        for entry in entries:
+            self._add(*entry)
+
+    def filter(self, papers: list):
+        """match() and commit() in one go: (unique, aliases), indexed right away."""
+        unique, aliases, entries = self.match(papers)
+        self.commit(entries)
+        return unique, aliases
@@ -0,0 +1,94 @@
+import importlib
+from abc import ABC, abstractmethod
+from config.settings import JOB_STORE, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS
+
+
+class JobStore(ABC):
+    """
+    Crawl frontier shared by every worker process: (query, page, filters) jobs with
+    lease / heartbeat semantics. A worker leases a job, renews its leases while it runs,
+    and completes or fails it; a lease that isn't renewed in time is handed to someone else.
+
+    Subclass this for a frontier that several hosts can reach (Postgres, Redis, ...) and
+    point JOB_STORE at it as "package.module:Class". The constructor receives the
+    ResearchDatabase the engine writes papers into. The request rate limit stays per host
+    (SharedRequestScheduler), so such a store needs its own shared limiter as well.
+    """
+    lease_seconds = JOB_LEASE_SECONDS
+
+    @abstractmethod
+    async def enqueue(self, jobs: list) -> int:
+        """Adds jobs; done ones are skipped, failed ones start over. Returns how many were (re)queued."""
+
+    @abstractmethod
+    async def lease(self, worker_id: str):
+        """(job_id, job_dict, attempt_number) for the next ready job, or None."""
+
+    @abstractmethod
+    async def heartbeat(self, worker_id: str, job_ids: list) -> int:
+        """Renews worker_id's leases on job_ids (jobs it is still working on). Returns how many were renewed."""
+
+    @abstractmethod
+    async def complete(self, job_id, follow_ups: list = ()) -> list:
+        """Marks the job done and enqueues follow_ups atomically with it. Returns the follow-ups that were added."""
+
+    @abstractmethod
+    async def fail(self, job_id, error: str, retry_delay: float = 0) -> str:
+        """Requeues the job after retry_delay, or marks it failed when out of attempts. Returns the new state."""
+
+    @abstractmethod
+    async def next_ready_time(self):
+        """Unix time the next job may become leasable, or None when the frontier is drained."""
+
+    @abstractmethod
+    async def count(self, state: str = 'pending') -> int:
+        """How many jobs are in state."""
+
+    @abstractmethod
+    async def recover(self) -> int:
+        """Single-process runs: requeues everything left in flight by a previous crash."""
+
+
+class SqliteJobStore(JobStore):
+    """
+    The crawl_jobs table of the research DB. Leases are single UPDATE ... RETURNING
+    statements, so any number of processes on one host can share it (WAL mode).
+    """
+    def __init__(self, db, lease_seconds: float = JOB_LEASE_SECONDS, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.db = db
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    async def enqueue(self, jobs: list) -> int:
+        return await self.db.enqueue_jobs(jobs)
+
+    async def lease(self, worker_id: str):
+        return await self.db.lease_job(worker_id, self.lease_seconds)
+
+    async def heartbeat(self, worker_id: str, job_ids: list) -> int:
+        return await self.db.heartbeat_jobs(worker_id, job_ids, self.lease_seconds)
+
+    async def complete(self, job_id, follow_ups: list = ()) -> list:
+        return await self.db.complete_job(job_id, follow_ups)
+
+    async def fail(self, job_id, error: str, retry_delay: float = 0) -> str:
+        return await self.db.fail_job(job_id, error, self.max_attempts, retry_delay)
+
+    async def next_ready_time(self):
+        return await self.db.next_job_time()
+
+    async def count(self, state: str = 'pending') -> int:
+        return await self.db.count_jobs(state)
+
+    async def recover(self) -> int:
+        return await self.db.recover_jobs()
+
+
+def open_job_store(db, spec: str = JOB_STORE) -> JobStore:
+    """"sqlite" or "package.module:Class" (a JobStore subclass taking the ResearchDatabase)."""
+    if spec == "sqlite":
+        return SqliteJobStore(db)
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"JOB_STORE must be 'sqlite' or 'package.module:Class', got {spec!r}")
+    return getattr(importlib.import_module(module_name), class_name)(db)
@@ -1,16 +1,75 @@
+import asyncio
 import ollama
 import json
-from config.settings import MODEL_NAME, LLM_KEYWORD_LIMIT
+from config.settings import MODEL_NAME, LLM_KEYWORD_LIMIT, PLAN_CACHE_TTL_DAYS, LLM_CONCURRENCY
 from rich import print as rprint
+from core.metrics import metrics
 
 class ResearchBrain:
-    def generate_search_plan(self, topic: str) -> list:
+    def __init__(self, db=None):
+        self.db = db                       # ResearchDatabase used for the topic -> queries cache
+        self.client = ollama.AsyncClient()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @staticmethod
+    def normalize_topic(topic: str) -> str:
+        return " ".join(topic.lower().split())
+
+    @staticmethod
+    def cache_key(topic: str) -> str:
+        """Plans depend on the model and keyword count as well as the topic."""
+        return f"{MODEL_NAME}|{LLM_KEYWORD_LIMIT}|{ResearchBrain.normalize_topic(topic)}"
+
+    def cache_stats(self) -> dict:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": self.cache_hits / lookups if lookups else 0.0
+        }
+
+    async def generate_search_plan(self, topic: str) -> list:
+        key = self.cache_key(topic)
+        if self.db:
+            cached = await self.db.get_search_plan(key, PLAN_CACHE_TTL_DAYS)
+            if cached:
+                self.cache_hits += 1
+                rprint(f"[magenta]Using cached strategy for '{topic}'[/magenta]")
+                return cached
+        self.cache_misses += 1
+
+        queries = await self._ask_llm(topic)
+        if not queries:
+            return [topic]
+
+        if self.db:
+            await self.db.save_search_plan(key, self.normalize_topic(topic), queries)
+        return queries
+
+    async def generate_search_plans(self, topics: list) -> dict:
+        """Expands many topics at once (bounded by LLM_CONCURRENCY). Returns {topic: queries}."""
+        semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+
+        async def expand(topic):
+            async with semaphore:
+                return await self.generate_search_plan(topic)
+
+        # Topics that normalize to the same key only cost one model call
+        unique = {}
+        for topic in topics:
+            unique.setdefault(self.cache_key(topic), topic)
+        plans = dict(zip(unique, await asyncio.gather(*(expand(t) for t in unique.values()))))
+        return {topic: plans[self.cache_key(topic)] for topic in topics}
+
+    async def _ask_llm(self, topic: str):
+        """Returns the generated queries, or None if the model call failed."""
         rprint(f"[magenta]Consulting {MODEL_NAME} for strategy...[/magenta]")
-        
+
         prompt = f"""
         Act as a Research Librarian.
         Topic: "{topic}"
-        
+
         Task: Generate exactly {LLM_KEYWORD_LIMIT} distinct Google Scholar search queries.
         Include a mix of broad concepts and specific technical terms.
 
@@ -21,13 +80,15 @@ class ResearchBrain:
         """
 
         try:
-            response = ollama.chat(model=MODEL_NAME, messages=[
-                {'role': 'user', 'content': prompt}
-            ], format='json')
-            
+            with metrics.timer("llm"):
+                response = await self.client.chat(model=MODEL_NAME, messages=[
+                    {'role': 'user', 'content': prompt}
+                ], format='json')
+
             data = json.loads(response['message']['content'])
-            return data.get('queries', [topic])
-            
+            queries = [q for q in data.get('queries', []) if isinstance(q, str) and q.strip()]
+            return queries or None
+
         except Exception as e:
             rprint(f"[red]LLM Error:[/red] {e}")
-            return [topic]
\ No newline at end of file
+            return None
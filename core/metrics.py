@@ -0,0 +1,117 @@
+import contextvars
+import json
+import random
+import time
+from contextlib import contextmanager
+from rich.table import Table
+from config.settings import METRICS_ENABLED, METRICS_FILE
+
+# Set once per worker task; every timer inside that task is attributed to it
+current_worker = contextvars.ContextVar("current_worker", default=None)
+
+RESERVOIR_SIZE = 2048   # Samples kept per series for percentiles; count/total/max stay exact
+
+
+class StageStats:
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if len(self.samples) < RESERVOIR_SIZE:
+            self.samples.append(seconds)
+        else:
+            # Reservoir sampling keeps memory flat on long runs
+            slot = random.randrange(self.count)
+            if slot < RESERVOIR_SIZE:
+                self.samples[slot] = seconds
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.samples.extend(other.samples)
+        if len(self.samples) > RESERVOIR_SIZE:
+            self.samples = random.sample(self.samples, RESERVOIR_SIZE)
+
+    def summary(self) -> dict:
+        ordered = sorted(self.samples)
+        def pct(p):
+            return ordered[min(int(len(ordered) * p), len(ordered) - 1)] * 1000 if ordered else 0.0
+        return {
+            "count": self.count,
+            "total_s": round(self.total, 3),
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(pct(0.50), 2),
+            "p95_ms": round(pct(0.95), 2),
+            "p99_ms": round(pct(0.99), 2),
+            "max_ms": round(self.max * 1000, 2)
+        }
+
+
+class Metrics:
+    """Per-stage wall-time timers, aggregated per stage and per (stage, worker)."""
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self.series = {}
+
+    @contextmanager
+    def timer(self, stage: str):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage: str, seconds: float, worker: str = None):
+        if not self.enabled:
+            return
+        key = (stage, worker or current_worker.get())
+        stats = self.series.get(key)
+        if stats is None:
+            stats = self.series[key] = StageStats()
+        stats.add(seconds)
+
+    def reset(self):
+        self.series = {}
+
+    def summary(self) -> dict:
+        """{"stages": {stage: stats}, "workers": {worker: {stage: stats}}}"""
+        stages = {}
+        for (stage, _), stats in self.series.items():
+            stages.setdefault(stage, StageStats()).merge(stats)
+        workers = {}
+        for (stage, worker), stats in self.series.items():
+            if worker:
+                workers.setdefault(worker, {})[stage] = stats.summary()
+        return {"stages": {k: v.summary() for k, v in stages.items()}, "workers": workers}
+
+    def write_json(self, path: str = METRICS_FILE, **extra):
+        """Appends this run's summary as one JSON line."""
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"ts": round(time.time(), 3), **extra, **self.summary()}) + "\n")
+
+    def table(self, title: str = "Stage Timings") -> Table:
+        table = Table(title=title)
+        table.add_column("Stage", style="cyan", no_wrap=True)
+        for col in ("Count", "Total s", "Mean ms", "p50 ms", "p95 ms", "p99 ms", "Max ms"):
+            table.add_column(col, justify="right")
+        stages = self.summary()["stages"]
+        for stage, s in sorted(stages.items(), key=lambda kv: -kv[1]["total_s"]):
+            table.add_row(stage, str(s["count"]), f"{s['total_s']:.2f}", f"{s['mean_ms']:.1f}",
+                          f"{s['p50_ms']:.1f}", f"{s['p95_ms']:.1f}", f"{s['p99_ms']:.1f}", f"{s['max_ms']:.1f}")
+        return table
+
+
+metrics = Metrics()
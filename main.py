@@ -1,4 +1,13 @@
+import argparse
 import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from rich.console import Console
 from rich.prompt import Prompt
 from rich.table import Table
@@ -6,55 +15,489 @@ from rich.panel import Panel
 from rich.progress import Progress
 from pyfiglet import Figlet
 from core.database import ResearchDatabase
+from core.job_store import open_job_store
 from core.llm_brain import ResearchBrain
 from core.config_manager import ConfigManager
+from core.metrics import metrics, current_worker
+from core.dedup import PaperDeduper
 from scraper.browser import StealthBrowser
-from scraper.parser import ScholarParser
-from config.settings import CONCURRENT_TABS, MAX_PAGES_PER_QUERY
+from scraper.scheduler import SharedRequestScheduler
+from scraper.parser import ScholarParser, parse_page
+from config.settings import (
+    MAX_PAGES_PER_QUERY, PARSE_EXECUTOR, PARSE_WORKERS, PLAN_CACHE_TTL_DAYS, DEDUP_ENABLED,
+    RESULTS_PER_PAGE, PAGINATION_MIN_NEW_RATIO, JOB_POLL_SECONDS, WORKER_PROCESSES, REFRESH_MAX_PAGES,
+    PIPELINE_QUEUE_SIZE, CITATION_DEPTH, CITATION_PAGES, CITATION_BUDGET
+)
 
 console = Console()
 cfg = ConfigManager()
 
+# Exit codes for the headless commands
+EXIT_OK, EXIT_FETCH_FAILURES, EXIT_BAD_INPUT, EXIT_INTERRUPTED = 0, 1, 2, 130
+
+def load_batch_specs(path: str) -> list:
+    """
+    Reads a batch file. One spec per line; blank lines and '#' comments are skipped.
+      plain text                          -> AI topic (expanded by the LLM)
+      {"topic": ..., "years": {...}, "pages": N}
+      {"query": ...,  "years": {...}, "pages": N}   -> literal query, no LLM
+      {"advanced_params": {...}, "pages": N}        -> same keys as the Advanced Search menu
+    """
+    specs = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if not line.startswith("{"):
+                specs.append({"topic": line})
+                continue
+            try:
+                spec = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: invalid JSON ({e})")
+            if not any(k in spec for k in ("topic", "query", "advanced_params")):
+                raise ValueError(f"{path}:{line_no}: needs 'topic', 'query' or 'advanced_params'")
+            if "pages" in spec:
+                try:
+                    spec["pages"] = int(spec["pages"])
+                except (TypeError, ValueError):
+                    spec["pages"] = 0
+                if spec["pages"] < 1:
+                    raise ValueError(f"{path}:{line_no}: 'pages' must be a positive integer")
+            specs.append(spec)
+    return specs
+
+def build_topic_jobs(queries: list, pages: int, year_data: dict) -> list:
+    """Page 1 of every query; later pages are enqueued one at a time (see next_page_job)."""
+    return [{'query': q, 'page': 1, 'max_pages': pages, 'years': year_data} for q in queries]
+
+def build_refresh_jobs(tracked: list, pages: int, today: str) -> list:
+    """
+    Incremental refresh: page 1 of every tracked query (see ResearchDatabase.tracked_queries),
+    newest first (scisbd=1) and limited to years since its last crawl. Pagination stops at
+    the first page with nothing new (see next_page_job). today tags the jobs, so a refresh
+    is resumable within the day and runs afresh the next. Queries whose stored year filter
+    isn't a number are skipped.
+    """
+    jobs = []
+    for t in tracked:
+        years = dict(t["years"] or {})
+        try:
+            low = int(years["min"]) if years.get("min") else None
+            high = int(years["max"]) if years.get("max") else None
+        except (TypeError, ValueError):
+            continue    # Can't narrow a window we can't read
+        if t["last_crawled"]:
+            last_year = int(t["last_crawled"][:4])
+            if low is None or low < last_year:
+                low = last_year
+                years["min"] = str(last_year)
+        if high is not None and high < (low or 0):
+            continue    # The query's year window closed before the last crawl
+        prefs = {**(t["prefs"] or cfg.config), "sort_by": "date"}
+        jobs.append({'query': t["query"], 'page': 1, 'max_pages': pages, 'years': years,
+                     'prefs': prefs, 'refresh': today})
+    return jobs
+
+def next_page_job(job: dict, results_on_page: int, found: int, new: int):
+    """
+    Adaptive pagination: returns (follow-up job or None, stop reason, query yield so far).
+    Stops on short/empty pages, or when too few of this page's papers were new
+    (refresh jobs: only once a page holds nothing new; they keep going while anything is).
+    The query's running yield is carried along in the job for reporting.
+    """
+    stats = job.get('yield', {"pages": 0, "found": 0, "new": 0})
+    stats = {"pages": stats["pages"] + 1, "found": stats["found"] + found, "new": stats["new"] + new}
+
+    if job['page'] >= job.get('max_pages', job['page']):
+        return None, "max_pages", stats
+    if results_on_page < RESULTS_PER_PAGE:
+        return None, "short_page", stats
+    if job.get('refresh'):
+        if not new:
+            return None, "all_known", stats
+    elif not found or new / found < PAGINATION_MIN_NEW_RATIO:
+        return None, "low_yield", stats
+    return {**job, 'page': job['page'] + 1, 'yield': stats}, None, stats
+
+class PageTask:
+    """One leased page on its way through the pipeline; html and papers are dropped as soon as they're consumed."""
+    __slots__ = ("job_id", "job", "attempt", "worker", "query", "html", "results", "papers")
+
+    def __init__(self, job_id, job, attempt, worker):
+        self.job_id = job_id
+        self.job = job
+        self.attempt = attempt
+        self.worker = worker
+        self.query = job.get('query', 'Advanced Search')
+        self.html = None
+        self.results = 0
+        self.papers = None
+
 class ScholarEngine:
     def __init__(self):
         self.db = ResearchDatabase()
-        self.brain = ResearchBrain()
+        self.jobs = open_job_store(self.db)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"   # Lease owner in a shared frontier
+        self.brain = ResearchBrain(self.db)
         self.browser = StealthBrowser()
         self.parser = ScholarParser()
+        self.parse_pool = None
+        self.deduper = PaperDeduper() if DEDUP_ENABLED else None
+        self.citation_depth = CITATION_DEPTH     # Cited-by hops for newly enqueued jobs (see citation_jobs)
+        self.citation_budget = CITATION_BUDGET
+        self._citations_left = 0                 # Budget left in this process's current run (not shared with other workers)
+        self._seen_clusters = None               # Clusters whose cited-by list is crawled or queued, loaded on first use
+        self._in_flight = 0                      # Leased jobs not yet completed/failed
+        self._leased = set()                     # Their ids, renewed by the heartbeat
+        self._parse_queue = None                 # Pipeline queues, created per run (see work)
+        self._save_queue = None
+        self._frontier_changed = asyncio.Event() # Wakes idle workers when follow-up pages may appear
+        self._dedup_lock = asyncio.Lock()        # One page at a time through dedup match -> write -> commit
+
+    async def start(self, launch_browser: bool = True, recover: bool = True):
+        """
+        Brings up long-lived resources (parse pool, DB connection + writer, browser tab pool).
+        recover=False leaves in-flight jobs alone: other processes may hold their leases.
+        """
+        if PARSE_EXECUTOR == "process":
+            self.parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+        elif PARSE_EXECUTOR == "thread":
+            self.parse_pool = ThreadPoolExecutor(max_workers=PARSE_WORKERS)
+        await self.db.init_db()
+        await self.db.purge_search_plans(PLAN_CACHE_TTL_DAYS)
+        if recover:
+            await self.jobs.recover()
+        if self.deduper is not None:
+            await self.warm_deduper()
+        self.db.start_writer()
+        if launch_browser and self.browser.fetch_mode == "browser":
+            # In http/auto mode Chromium is launched lazily, on the first fallback
+            await self.browser.start()
+
+    async def shutdown(self):
+        await self.browser.close()
+        await self.db.close()
+        if self.parse_pool:
+            self.parse_pool.shutdown(cancel_futures=True)
+            self.parse_pool = None
+
+    async def warm_deduper(self):
+        """Loads every stored paper into the near-duplicate index (CPU work runs off the loop)."""
+        with metrics.timer("dedup_warm"):
+            async for rows in self.db.iter_dedup_corpus():
+                await asyncio.to_thread(self.deduper.warm, rows)
+
+    async def save_page(self, papers: list, cites: str = None) -> int:
+        """
+        Near-duplicate filter, then one batched write. Returns the number of new papers.
+        On a cited-by page (cites = the cited cluster) every result is recorded as citing it, known papers included.
+        Pages go through the deduper one at a time: two save stages matching at once would each
+        miss the other's papers and store the same paper twice.
+        """
+        citations = [(cites, p.cluster_id) for p in papers if p.cluster_id] if cites else []
+        if self.deduper is not None:
+            async with self._dedup_lock:
+                with metrics.timer("dedup"):
+                    papers, aliases, entries = self.deduper.match(papers)
+                saved = await self.db.queue_papers(papers, citations)
+                # Only stored papers join the index; after a failed write the retried page matches nothing stale
+                self.deduper.commit(entries)
+            await self.db.save_aliases(aliases)
+            return saved
+        return await self.db.queue_papers(papers, citations)
+
+    async def citation_jobs(self, job: dict, papers: list) -> list:
+        """
+        Cited-by expansion: a page-1 job for the "Cited by" list of each paper on this page,
+        most-cited first, while the job has hops left (cite_depth) and the run has budget.
+        The cluster id is the job key, so a list is never queued twice. The jobs are taken out of the
+        budget here; release_citations() gives back the ones that didn't make it into the frontier.
+        """
+        depth = job.get('cite_depth', 0)
+        if depth <= 0 or self._citations_left <= 0:
+            return []
+        if self._seen_clusters is None:
+            seen = await self.db.expanded_clusters()
+            if self._seen_clusters is None:   # Another save stage may have loaded it meanwhile
+                self._seen_clusters = seen
+
+        jobs = []
+        for paper in sorted(papers, key=lambda p: p.cited_by, reverse=True):
+            if len(jobs) >= self._citations_left:
+                break
+            if not paper.cited_by or not paper.cluster_id or paper.cluster_id in self._seen_clusters:
+                continue
+            self._seen_clusters.add(paper.cluster_id)
+            jobs.append({'query': 'Cited by', 'page': 1, 'max_pages': CITATION_PAGES, 'years': {},
+                         'prefs': job.get('prefs'), 'cites': paper.cluster_id, 'cite_depth': depth - 1})
+        self._citations_left -= len(jobs)
+        return jobs
+
+    def release_citations(self, jobs: list, added: list = None):
+        """
+        Refunds the budget for cited-by jobs that weren't added: another worker had queued them
+        (added = what complete() returned), or the completion failed (added = None) and the
+        clusters must stay expandable when the page is retried.
+        """
+        kept = {job['cites'] for job in added or () if job.get('cites')}
+        for job in jobs:
+            if job['cites'] in kept:
+                continue
+            self._citations_left += 1
+            if added is None:
+                self._seen_clusters.discard(job['cites'])
+
+    async def parse(self, html, label):
+        """Parses off the event loop when a pool is configured; returns (result_count, papers)."""
+        with metrics.timer("parse"):
+            if not self.parse_pool:
+                return self.parser.parse_page(html, label)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.parse_pool, parse_page, html, label, self.parser.backend)
+
+    async def worker(self, name, report):
+        """Fetch stage: leases jobs from the persisted crawl frontier and hands each page to the parse stage."""
+        current_worker.set(name)
+        while True:
+            self._frontier_changed.clear()
+            leased = await self.jobs.lease(self.worker_id)
+            if not leased:
+                # Nothing ready: a retry may be backing off, or a job in flight (here or in
+                # another process) may enqueue its next page or have its lease expire
+                ready_at = await self.jobs.next_ready_time()
+                if ready_at is None and not self._in_flight:
+                    break
+                timeout = None if ready_at is None else min(JOB_POLL_SECONDS, max(0.0, ready_at - time.time()))
+                try:
+                    await asyncio.wait_for(self._frontier_changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = PageTask(*leased, name)
+            self._in_flight += 1
+            self._leased.add(task.job_id)
 
-    async def worker(self, name, queue, progress, task_id):
-        """Async worker that pulls queries from queue."""
-        while not queue.empty():
-            job = await queue.get()
-            
             # Extract basic info with defaults
-            query_text = job.get('query', 'Advanced Search')
-            page = job['page']
+            job = task.job
             years = job.get('years', {})
             adv_params = job.get('advanced_params', None) # <--- NEW PARAMETER
-            
-            progress.update(task_id, description=f"[cyan]{name}[/] scraping: {query_text} (Pg {page})")
-            
-            # Pass advanced_params to browser
-            html = await self.browser.fetch_scholar_results(query_text, page, cfg.config, years, adv_params)
-            
-            # 2. Parse Data
-            if html:
+            prefs = job.get('prefs') or cfg.config
+
+            try:
+                report({"event": "fetching", "worker": name, "query": task.query, "page": job['page']})
+
+                # Pass advanced_params to browser
+                task.html = await self.browser.fetch_scholar_results(task.query, job['page'], prefs, years, adv_params,
+                                                                     job.get('cites'))
+                if not task.html:
+                    raise RuntimeError("fetch failed")
+            except Exception as e:
+                await self._fail_task(task, e, report)
+                continue
+
+            # Backpressure: blocks while parsing / saving lag behind, so buffered pages stay bounded
+            with metrics.timer("pipeline_wait"):
+                await self._parse_queue.put(task)
+
+    async def parse_stage(self, name, report):
+        """Parse stage: HTML -> Paper records (in the parse pool when one is configured)."""
+        current_worker.set(name)
+        while True:
+            task = await self._parse_queue.get()
+            try:
+                html, task.html = task.html, None
                 # Use query text or "Advanced Search" as the label
-                label = query_text if not adv_params else "Advanced Search"
-                papers = self.parser.parse_html(html, label)
-                
-                # 3. Save to DB
-                saved_count = 0
-                for paper in papers:
-                    if await self.db.save_paper(paper):
-                        saved_count += 1
-                
-                console.print(f"   [green]✔ {name}[/] found {len(papers)} papers ({saved_count} new) on Pg {page}")
-            else:
-                console.print(f"   [red]✖ {name}[/] failed to fetch Pg {page}")
-            
-            queue.task_done()
+                label = task.query if not task.job.get('advanced_params') else "Advanced Search"
+                task.results, task.papers = await self.parse(html, label)
+            except Exception as e:
+                await self._fail_task(task, e, report)
+                continue
+            await self._save_queue.put(task)
+
+    async def save_stage(self, name, report):
+        """Dedup + write stage; several run at once so the background writer can fold their pages into one commit."""
+        current_worker.set(name)
+        while True:
+            task = await self._save_queue.get()
+            job, page = task.job, task.job['page']
+            citations = []
+            try:
+                papers, task.papers = task.papers, None
+                # Dedup + save to DB (one batched transaction per page)
+                saved_count = await self.save_page(papers, job.get('cites'))
+
+                # Decide whether this query deserves another page, and which cited-by lists to expand
+                follow_up, stop_reason, stats = next_page_job(job, task.results, len(papers), saved_count)
+                citations = await self.citation_jobs(job, papers)
+                added = await self.jobs.complete(task.job_id, ([follow_up] if follow_up else []) + citations)
+                self.release_citations(citations, added)
+                citations = []   # Settled; a later error must not refund them again
+                if added:
+                    report({"event": "queued", "jobs": len(added)})
+
+                report({"event": "page", "worker": task.worker, "query": task.query, "page": page,
+                        "found": len(papers), "new": saved_count})
+                if stop_reason:
+                    report({"event": "query_done", "worker": task.worker, "query": task.query, "page": page,
+                            "reason": stop_reason, **stats})
+            except Exception as e:
+                self.release_citations(citations)
+                await self._fail_task(task, e, report)
+                continue
+            self._end_task(task)
+
+    async def _fail_task(self, task, error, report):
+        """Requeues (or fails) the task's job. Never raises: a dead stage would stall the bounded queues."""
+        try:
+            delay = self.browser.scheduler.retry_delay(task.attempt)
+            state = await self.jobs.fail(task.job_id, str(error), delay)
+            report({"event": "failed" if state == "failed" else "retry", "worker": task.worker,
+                    "query": task.query, "page": task.job['page'], "attempt": task.attempt, "error": str(error)})
+        except Exception as e:
+            # The job stays leased; it goes back to the frontier once its lease expires
+            console.print(f"[red]{task.worker}: could not requeue {task.query} (Pg {task.job['page']}):[/red] {e}")
+        finally:
+            self._end_task(task)
+
+    def _end_task(self, task):
+        self._in_flight -= 1
+        self._leased.discard(task.job_id)
+        self._frontier_changed.set()
+
+    async def enqueue(self, jobs: list) -> int:
+        """
+        Adds jobs with a frozen copy of the current search prefs, so a resumed job builds the same URL,
+        and the cited-by depth they should expand to.
+        """
+        return await self.jobs.enqueue([{**job, 'prefs': job.get('prefs') or dict(cfg.config),
+                                         'cite_depth': job.get('cite_depth', self.citation_depth)} for job in jobs])
+
+    async def _heartbeat(self):
+        """Keeps this process's leases alive while its workers run."""
+        while True:
+            await asyncio.sleep(self.jobs.lease_seconds / 3)
+            try:
+                await self.jobs.heartbeat(self.worker_id, list(self._leased))
+            except Exception as e:
+                console.print(f"[red]Heartbeat failed:[/red] {e}")
+
+    async def work(self, report) -> dict:
+        """Drains the frontier through the fetch -> parse -> save pipeline. Returns run totals."""
+        totals = {"pages": 0, "failed": 0, "found": 0, "new": 0}
+
+        def track(event):
+            if event["event"] == "page":
+                totals["pages"] += 1
+                totals["found"] += event["found"]
+                totals["new"] += event["new"]
+            elif event["event"] == "failed":
+                totals["failed"] += 1
+            report(event)
+
+        self._citations_left = self.citation_budget
+        self._seen_clusters = None   # Other processes may have expanded clusters since the last run
+
+        # fetch (one worker per tab) -> parse -> dedup + write, joined by bounded queues
+        self._parse_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self._save_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        parsers = PARSE_WORKERS if self.parse_pool else 1
+        stages = [asyncio.create_task(self._heartbeat())]
+        stages += [asyncio.create_task(self.parse_stage(f"Parser-{i+1}", track)) for i in range(parsers)]
+        stages += [asyncio.create_task(self.save_stage(f"Saver-{i+1}", track)) for i in range(self.browser.pool_size)]
+
+        started = time.monotonic()
+        workers = [
+            asyncio.create_task(self.worker(f"Worker-{i+1}", track))
+            for i in range(self.browser.pool_size)
+        ]
+        fetchers = asyncio.gather(*workers)
+        try:
+            # Workers only return once nothing is in flight, i.e. every page made it through the stages.
+            # Stages never return, so one finishing first means it died: stop rather than block on its queue.
+            done, _ = await asyncio.wait([fetchers, *stages], return_when=asyncio.FIRST_COMPLETED)
+            if fetchers not in done:
+                stage = done.pop()
+                stage.result()
+                raise RuntimeError("a pipeline stage stopped unexpectedly")
+            fetchers.result()
+        finally:
+            for task in workers + stages:
+                task.cancel()
+            await asyncio.gather(fetchers, *stages, return_exceptions=True)
+        totals["elapsed_sec"] = round(time.monotonic() - started, 2)
+
+        if metrics.enabled:
+            metrics.write_json(**totals)
+        return totals
+
+    async def crawl(self, jobs: list, report) -> dict:
+        """
+        Adds jobs to the frontier and drains it (see work).
+        Pending jobs left by an interrupted run are picked up too. Returns run totals.
+        """
+        await self.enqueue(jobs)
+        queued = await self.jobs.count('pending')
+        report({"event": "queued", "jobs": queued})
+        return {**await self.work(report), "queued": queued}
+
+    async def crawl_with_progress(self, jobs: list, title: str) -> dict:
+        """Interactive crawl: Rich progress bar plus one console line per page."""
+        with Progress() as progress:
+            task_id = progress.add_task(title, total=None)
+
+            def report(event):
+                if event["event"] == "queued":
+                    progress.update(task_id, total=(progress.tasks[task_id].total or 0) + event["jobs"])
+                    return
+                if event["event"] == "query_done":
+                    return
+                name, page = event["worker"], event["page"]
+                if event["event"] == "fetching":
+                    progress.update(task_id, description=f"[cyan]{name}[/] scraping: {event['query']} (Pg {page})")
+                    return
+                if event["event"] == "retry":
+                    console.print(f"   [yellow]↻ {name}[/] will retry Pg {page}")
+                    return
+                progress.advance(task_id)
+                if event["event"] == "page":
+                    console.print(f"   [green]✔ {name}[/] found {event['found']} papers ({event['new']} new) on Pg {page}")
+                else:
+                    console.print(f"   [red]✖ {name}[/] failed to fetch Pg {page}")
+
+            totals = await self.crawl(jobs, report)
+
+        if metrics.enabled:
+            console.print(Panel(metrics.table(), title=f"Run Report: {totals['pages']} pages in {totals['elapsed_sec']}s"))
+            metrics.reset()
+        return totals
+
+    async def replay_cache(self):
+        """Re-parses every page in the HTML cache into the DB. No browser involved."""
+        cache = self.browser.cache
+        if not cache:
+            console.print("[red]HTML cache is disabled (CACHE_ENABLED = False).[/red]")
+            return 0, 0, 0
+        pages = found = saved = 0
+        entries = cache.entries()
+        with console.status("[cyan]Replaying cached pages...[/]") as status:
+            while True:
+                entry = await asyncio.to_thread(next, entries, None)
+                if entry is None:
+                    break
+                meta, html = entry
+                label = meta.get("query", "Advanced Search") if not meta.get("advanced") else "Advanced Search"
+                _, papers = await self.parse(html, label)
+                try:
+                    saved += await self.save_page(papers, meta.get("cites"))
+                except Exception as e:
+                    console.print(f"[red]DB Error ({meta.get('url')}):[/red] {e}")
+                    continue
+                found += len(papers)
+                pages += 1
+                status.update(f"[cyan]Replaying cached pages...[/] {pages} pages, {found} papers")
+        return pages, found, saved
 
     def advanced_search_input(self):
         """Collects exact Google Scholar Advanced Search parameters."""
@@ -117,11 +560,16 @@ class ScholarEngine:
             console.print("\n[1] Standard Scrap (AI Topics)", style="bold green")
             console.print("[2] Advanced Search (Manual)", style="bold magenta")
             console.print("[3] Search Settings", style="bold blue")
-            console.print("[4] Export as CSV", style="bold blue")
+            console.print("[4] Export Data (CSV / JSONL / Parquet)", style="bold blue")
+            console.print("[5] Replay HTML Cache (re-parse stored pages)", style="bold blue")
+            unfinished = await self.jobs.count('pending')
+            if unfinished:
+                console.print(f"[6] Resume Interrupted Crawl ({unfinished} pages left)", style="bold yellow")
+            console.print("[7] Refresh Tracked Queries (new results only)", style="bold green")
             console.print("[0] Exit", style="bold red")
             print("\n")
             
-            choice = Prompt.ask("Select Option", choices=["1", "2", "3", "4", "0"], default="1")
+            choice = Prompt.ask("Select Option", choices=["1", "2", "3", "4", "5", "6", "7", "0"], default="1")
             
             if choice == "0":
                 console.print("[yellow]Goodbye![/yellow]")
@@ -131,15 +579,44 @@ class ScholarEngine:
             if choice == "4":
                 console.print("\n[bold green]Exporting Data...[/bold green]")
                 # Call the export function from check_db.py
+                fmt = Prompt.ask("Format", choices=["csv", "jsonl", "parquet"], default="csv")
+                incremental = Prompt.ask("Only papers added since the last export?", choices=["y", "n"], default="n") == "y"
                 try:
-                    from check_db import export_to_csv
-                    export_to_csv()
+                    from check_db import export_papers
+                    export_papers(fmt=fmt, incremental=incremental)
                 except ImportError:
-                    console.print("[red]Could not import 'export_to_csv' from check_db.py[/red]")
+                    console.print("[red]Could not import 'export_papers' from check_db.py[/red]")
+                except RuntimeError as e:
+                    console.print(f"[red]{e}[/red]")
                 
                 Prompt.ask("\nPress Enter to return to menu...")
                 continue
                 
+            # --- RESUME ---
+            if choice == "6":
+                totals = await self.crawl_with_progress([], "[yellow]Resuming...[/]")
+                console.rule(f"[bold green]Resumed {totals['pages']} pages ({totals['new']} new papers)[/bold green]")
+                Prompt.ask("\nPress Enter to return to menu...")
+                continue
+
+            # --- REFRESH ---
+            if choice == "7":
+                jobs = await self.refresh_jobs()
+                if not jobs:
+                    console.print("[yellow]Nothing to refresh yet: crawl some topics first.[/yellow]")
+                else:
+                    totals = await self.crawl_with_progress(jobs, f"[green]Refreshing {len(jobs)} queries...[/]")
+                    console.rule(f"[bold green]Refresh done: {totals['pages']} pages, {totals['new']} new papers[/bold green]")
+                Prompt.ask("\nPress Enter to return to menu...")
+                continue
+
+            # --- REPLAY CACHE ---
+            if choice == "5":
+                pages, found, saved = await self.replay_cache()
+                console.rule(f"[bold green]Replayed {pages} pages: {found} papers ({saved} new)[/bold green]")
+                Prompt.ask("\nPress Enter to return to menu...")
+                continue
+
             # --- SETTINGS ---
             if choice == "3":
                 self.settings_menu()
@@ -158,24 +635,16 @@ class ScholarEngine:
                 # Ask depth for advanced search
                 pages = int(Prompt.ask("\nHow many pages to scrape?", default="3"))
                 
-                queue = asyncio.Queue()
-                for i in range(1, pages + 1):
-                    queue.put_nowait({
-                        'query': 'Advanced Search', 
-                        'page': i,
-                        'years': {}, # Years handled inside params
-                        'advanced_params': adv_params
-                    })
-                
-                with Progress() as progress:
-                    task_id = progress.add_task("[magenta]Precision Scrapping...[/]", total=queue.qsize())
-                    workers = [
-                        asyncio.create_task(self.worker(f"Worker-{i+1}", queue, progress, task_id))
-                        for i in range(CONCURRENT_TABS)
-                    ]
-                    await queue.join()
-                    for w in workers: w.cancel()
-                
+                jobs = [{
+                    'query': 'Advanced Search',
+                    'page': 1,
+                    'max_pages': pages,
+                    'years': {}, # Years handled inside params
+                    'advanced_params': adv_params
+                }]
+
+                await self.crawl_with_progress(jobs, "[magenta]Precision Scrapping...[/]")
+
                 total = await self.db.get_stats()
                 console.rule(f"[bold green]Advanced Search Complete. Total DB: {total}[/bold green]")
                 Prompt.ask("Press Enter...")
@@ -187,7 +656,7 @@ class ScholarEngine:
                 topic = Prompt.ask("\n[bold green]Enter Research Topic[/bold green]")
                 
                 # 1. Generate Plan First
-                queries = self.brain.generate_search_plan(topic)
+                queries = await self.brain.generate_search_plan(topic)
                 
                 # Show the Keywords
                 table = Table(title="Generated Keywords")
@@ -208,28 +677,248 @@ class ScholarEngine:
                     continue
 
                 # Fill Queue based on MAX_PAGES_PER_QUERY
-                queue = asyncio.Queue()
-                for q in queries:
-                    for i in range(1, MAX_PAGES_PER_QUERY + 1):
-                        # Pass the year_data into every job
-                        queue.put_nowait({'query': q, 'page': i, 'years': year_data})
+                jobs = build_topic_jobs(queries, MAX_PAGES_PER_QUERY, year_data)
 
                 # Launch Workers
-                with Progress() as progress:
-                    task_id = progress.add_task("[green]Scrapping...[/]", total=queue.qsize())
-                    workers = [
-                        asyncio.create_task(self.worker(f"Worker-{i+1}", queue, progress, task_id))
-                        for i in range(CONCURRENT_TABS)
-                    ]
-                    await queue.join()
-                    for w in workers: w.cancel()
+                await self.crawl_with_progress(jobs, "[green]Scrapping...[/]")
 
                 total_papers = await self.db.get_stats()
                 console.rule(f"[bold green]Scrapping Complete. Total Papers: {total_papers}[/bold green]")
                 Prompt.ask("\nPress Enter to return to menu...")
 
+    async def build_batch_jobs(self, specs: list, default_pages: int, use_llm: bool, emit) -> list:
+        """Expands batch specs (see load_batch_specs) into page-1 jobs, topics through the LLM."""
+        topics = [s["topic"] for s in specs if "topic" in s]
+        plans = await self.brain.generate_search_plans(topics) if (topics and use_llm) else {}
+        emit({"event": "plan", "topics": len(topics), "llm_cache": self.brain.cache_stats()})
+
+        jobs = []
+        for spec in specs:
+            pages = spec.get("pages", default_pages)
+            if "advanced_params" in spec:
+                jobs.append({'query': 'Advanced Search', 'page': 1, 'max_pages': pages, 'years': {},
+                             'advanced_params': spec["advanced_params"]})
+            else:
+                text = spec.get("query") or spec["topic"]
+                # Plans are keyed by topic; a spec's own query is the fallback when there's no plan
+                queries = plans.get(spec["topic"], [text]) if "topic" in spec else [text]
+                jobs += build_topic_jobs(queries, pages, spec.get("years", {}))
+        return jobs
+
+    async def refresh_jobs(self, pages: int = REFRESH_MAX_PAGES, match: str = None) -> list:
+        """Refresh jobs for every tracked query (optionally only those containing match)."""
+        tracked = await self.db.tracked_queries()
+        if match:
+            tracked = [t for t in tracked if match.lower() in t["query"].lower()]
+        return build_refresh_jobs(tracked, pages, time.strftime("%Y-%m-%d"))
+
+    async def run_batch(self, specs: list, default_pages: int, use_llm: bool, emit) -> int:
+        """Headless run: expands every spec up front and crawls all of it through one worker pool."""
+        jobs = await self.build_batch_jobs(specs, default_pages, use_llm, emit)
+
+        def report(event):
+            if event["event"] != "fetching":
+                emit(event)
+
+        emit({"event": "start", "specs": len(specs), "workers": self.browser.pool_size})
+        totals = await self.crawl(jobs, report)
+        if metrics.enabled:
+            emit({"event": "metrics", **metrics.summary()})
+            metrics.reset()
+        emit({"event": "done", **totals, "total_papers": await self.db.get_stats(),
+              "scheduler": self.browser.scheduler.stats()})
+
+        return EXIT_FETCH_FAILURES if totals["failed"] else EXIT_OK
+
+async def main():
+    engine = ScholarEngine()
+    await engine.start()
+    try:
+        await engine.run()
+    finally:
+        await engine.shutdown()
+
+async def main_batch(args, emit) -> int:
+    try:
+        specs = load_batch_specs(args.file)
+    except (OSError, ValueError) as e:
+        emit({"event": "error", "error": str(e)})
+        return EXIT_BAD_INPUT
+    if not specs:
+        emit({"event": "error", "error": f"no topics in {args.file}"})
+        return EXIT_BAD_INPUT
+
+    engine = ScholarEngine()
+    engine.citation_depth = args.cited_by
+    await engine.start()
+    try:
+        return await engine.run_batch(specs, args.pages, not args.no_llm, emit)
+    finally:
+        await engine.shutdown()
+
+async def main_replay(emit) -> int:
+    engine = ScholarEngine()
+    await engine.start(launch_browser=False)
+    try:
+        pages, found, saved = await engine.replay_cache()
+        emit({"event": "done", "pages": pages, "found": found, "new": saved})
+        return EXIT_OK
+    finally:
+        await engine.shutdown()
+
+async def main_refresh(args, emit) -> int:
+    engine = ScholarEngine()
+    await engine.start()
+    try:
+        jobs = await engine.refresh_jobs(args.pages, args.match)
+        emit({"event": "refresh", "queries": len(jobs)})
+
+        def report(event):
+            if event["event"] != "fetching":
+                emit(event)
+
+        totals = await engine.crawl(jobs, report)
+        emit({"event": "done", **totals, "total_papers": await engine.db.get_stats()})
+        return EXIT_FETCH_FAILURES if totals["failed"] else EXIT_OK
+    finally:
+        await engine.shutdown()
+
+async def main_coordinator(args, emit) -> int:
+    """Fills the shared frontier from a batch file and exits; `worker` processes do the crawling."""
+    try:
+        specs = load_batch_specs(args.file)
+    except (OSError, ValueError) as e:
+        emit({"event": "error", "error": str(e)})
+        return EXIT_BAD_INPUT
+    if not specs:
+        emit({"event": "error", "error": f"no topics in {args.file}"})
+        return EXIT_BAD_INPUT
+
+    engine = ScholarEngine()
+    engine.citation_depth = args.cited_by
+    try:
+        await engine.db.init_db()
+        await engine.db.purge_search_plans(PLAN_CACHE_TTL_DAYS)
+        jobs = await engine.build_batch_jobs(specs, args.pages, not args.no_llm, emit)
+        added = await engine.enqueue(jobs)
+        emit({"event": "queued", "jobs": added, "pending": await engine.jobs.count('pending')})
+        return EXIT_OK
+    finally:
+        await engine.db.close()
+
+async def main_worker(follow: bool, emit) -> int:
+    """One worker process: drains the shared frontier, pacing requests with the host-wide bucket."""
+    engine = ScholarEngine()
+    engine.browser.scheduler = SharedRequestScheduler(engine.db.db_path)
+    await engine.start(recover=False)
+
+    def report(event):
+        if event["event"] != "fetching":
+            emit({"process": engine.worker_id, **event})
+
+    failed = 0
+    try:
+        while True:
+            totals = await engine.work(report)
+            failed += totals["failed"]
+            if totals["pages"] or totals["failed"]:
+                emit({"event": "drained", "process": engine.worker_id, **totals,
+                      "scheduler": engine.browser.scheduler.stats()})
+                metrics.reset()
+            if not follow:
+                break
+            await asyncio.sleep(JOB_POLL_SECONDS)   # Wait for a coordinator to queue more
+    finally:
+        await engine.shutdown()
+    return EXIT_FETCH_FAILURES if failed else EXIT_OK
+
+def _worker_process(follow: bool):
+    sys.exit(run_headless(argparse.Namespace(command="_worker", follow=follow)))
+
+def run_workers(args) -> int:
+    """`worker --processes N`: N independent engines on one frontier. Exit code is the worst of theirs."""
+    # Migrate once up front, so the processes don't race each other through the schema upgrade
+    async def prepare():
+        db = ResearchDatabase()
+        await db.init_db()
+        await db.close()
+    with contextlib.redirect_stdout(sys.stderr):
+        asyncio.run(prepare())
+
+    if args.processes <= 1:
+        return run_headless(argparse.Namespace(command="_worker", follow=args.follow))
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_worker_process, args=(args.follow,)) for _ in range(args.processes)]
+    for proc in procs:
+        proc.start()
+    try:
+        for proc in procs:
+            proc.join()
+    except KeyboardInterrupt:
+        # Children got the same Ctrl-C; unfinished leases expire and go back to the frontier
+        for proc in procs:
+            proc.join()
+        return EXIT_INTERRUPTED
+    return max(proc.exitcode or 0 for proc in procs)
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Scholar Scrapper. Run without a command for the interactive menu.")
+    sub = ap.add_subparsers(dest="command")
+
+    batch = sub.add_parser("batch", help="crawl every topic in a file unattended, JSON-lines progress on stdout")
+    batch.add_argument("file", help="one topic per line, or one JSON spec per line (see load_batch_specs)")
+    batch.add_argument("--pages", type=int, default=MAX_PAGES_PER_QUERY, help="pages per query unless a spec sets 'pages'")
+    batch.add_argument("--no-llm", action="store_true", help="use plain topics as literal queries")
+    batch.add_argument("--cited-by", type=int, default=CITATION_DEPTH, metavar="DEPTH",
+                       help="also crawl the 'Cited by' lists of harvested papers, DEPTH hops out")
+
+    sub.add_parser("replay", help="re-parse every cached page into the DB (no browser)")
+
+    refresh = sub.add_parser("refresh", help="re-crawl every stored query for results newer than its last crawl")
+    refresh.add_argument("--pages", type=int, default=REFRESH_MAX_PAGES, help="page cap per query")
+    refresh.add_argument("--match", help="only queries containing this text")
+
+    coord = sub.add_parser("coordinator", help="expand a batch file into the shared job store and exit")
+    coord.add_argument("file", help="same format as for batch")
+    coord.add_argument("--pages", type=int, default=MAX_PAGES_PER_QUERY, help="pages per query unless a spec sets 'pages'")
+    coord.add_argument("--no-llm", action="store_true", help="use plain topics as literal queries")
+    coord.add_argument("--cited-by", type=int, default=CITATION_DEPTH, metavar="DEPTH",
+                       help="workers also crawl the 'Cited by' lists of harvested papers, DEPTH hops out")
+
+    worker = sub.add_parser("worker", help="crawl jobs from the shared job store until it is drained")
+    worker.add_argument("--processes", type=int, default=WORKER_PROCESSES, help="worker processes on this host")
+    worker.add_argument("--follow", action="store_true", help="keep polling for new jobs instead of exiting")
+    return ap.parse_args(argv)
+
+def run_headless(args) -> int:
+    # JSON lines own stdout; everything else (Rich, warnings) goes to stderr
+    out = sys.stdout
+    def emit(event):
+        out.write(json.dumps({"ts": round(time.time(), 3), **event}) + "\n")
+        out.flush()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            if args.command == "batch":
+                return asyncio.run(main_batch(args, emit))
+            if args.command == "refresh":
+                return asyncio.run(main_refresh(args, emit))
+            if args.command == "coordinator":
+                return asyncio.run(main_coordinator(args, emit))
+            if args.command == "_worker":
+                return asyncio.run(main_worker(args.follow, emit))
+            return asyncio.run(main_replay(emit))
+        except KeyboardInterrupt:
+            emit({"event": "interrupted"})
+            return EXIT_INTERRUPTED
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "worker":
+        sys.exit(run_workers(args))
+    if args.command:
+        sys.exit(run_headless(args))
     try:
-        asyncio.run(ScholarEngine().run())
+        asyncio.run(main())
     except KeyboardInterrupt:
         print("\nExiting...")
\ No newline at end of file
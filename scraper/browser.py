@@ -4,81 +4,240 @@ import random
 from urllib.parse import urlencode # <--- ADD THIS IMPORT
 from playwright.async_api import async_playwright
 from playwright_stealth import stealth_async
-from config.settings import Global_TIMEOUT, Human_DELAY_MIN, Human_DELAY_MAX
+from config.settings import (
+    Global_TIMEOUT, Human_DELAY_MIN, Human_DELAY_MAX,
+    CONCURRENT_TABS, HEADLESS, PAGE_MAX_USES, CACHE_ENABLED, FETCH_MODE, SCHOLAR_BASE_URL
+)
+import httpx
+from scraper.cache import HtmlCache
+from scraper.http_fetcher import HttpFetcher, BlockedError
+from scraper.scheduler import RequestScheduler
+from core.metrics import metrics
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+def build_scholar_url(query: str, page_num: int, search_prefs: dict, years: dict, advanced_params: dict = None,
+                      base: str = SCHOLAR_BASE_URL, cites: str = None) -> str:
+    """Final Scholar URL for a job; also the HTML cache key. cites lists the papers citing that cluster instead."""
+    # --- URL CONSTRUCTION ---
+    base_url = f"{base.rstrip('/')}/scholar"
+    start_index = (page_num - 1) * 10
+
+    # --- URL CONSTRUCTION ---
+    if advanced_params:
+        # MODE A: ADVANCED SEARCH (Manual Inputs)
+        # Google Scholar Advanced Search Parameters
+        params = {
+            "start": start_index,
+            "as_q": advanced_params.get("all_words", ""),       # All words
+            "as_epq": advanced_params.get("exact_phrase", ""),  # Exact phrase
+            "as_oq": advanced_params.get("at_least_one", ""),   # At least one
+            "as_eq": advanced_params.get("without_words", ""),  # Without
+            "as_occt": advanced_params.get("occurrence", "any"),# "any" or "title"
+            "as_sauthors": advanced_params.get("author", ""),   # Author
+            "as_publication": advanced_params.get("pub", ""),   # Publication
+            "as_ylo": advanced_params.get("date_low", ""),      # Year Low
+            "as_yhi": advanced_params.get("date_high", "")      # Year High
+        }
+        # Filter out empty keys to keep URL clean
+        clean_params = {k: v for k, v in params.items() if v}
+        final_url = f"{base_url}?{urlencode(clean_params)}"
+
+    else:
+        # MODE B: STANDARD SEARCH (LLM Keywords)
+        if cites:
+            params_str = f"?start={start_index}&cites={cites}"
+        else:
+            params_str = f"?start={start_index}&q={query.replace(' ', '+')}"
+
+        # Apply Preferences
+        if search_prefs.get("sort_by") == "date": params_str += "&scisbd=1"
+        if search_prefs.get("article_type") == "review": params_str += "&as_rr=1"
+
+        # Apply Dynamic Years
+        if years and years.get("min"): params_str += f"&as_ylo={years['min']}"
+        if years and years.get("max"): params_str += f"&as_yhi={years['max']}"
+
+        final_url = base_url + params_str
+    # ------------------------
+    return final_url
+
+
+class PooledTab:
+    """A reusable context + page pair owned by the StealthBrowser pool."""
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+
 
 class StealthBrowser:
-    async def fetch_scholar_results(self, query: str, page_num: int, search_prefs: dict, years: dict, advanced_params: dict = None):
-        """
-        Fetches results. Supports both Standard (LLM) and Advanced (Manual) modes.
-        """
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=False) 
-            context = await browser.new_context(
+    def __init__(self, pool_size: int = CONCURRENT_TABS, headless: bool = HEADLESS, fetch_mode: str = FETCH_MODE,
+                 base_url: str = SCHOLAR_BASE_URL):
+        self.pool_size = pool_size
+        self.headless = headless
+        self.fetch_mode = fetch_mode
+        self.base_url = base_url
+        self._playwright = None
+        self._browser = None
+        self._pool = None
+        self._start_lock = asyncio.Lock()
+        self.cache = HtmlCache() if CACHE_ENABLED else None
+        self.scheduler = RequestScheduler()
+        self.http = HttpFetcher() if fetch_mode != "browser" else None
+
+    async def start(self):
+        """Launches one long-lived Chromium and fills the tab pool."""
+        async with self._start_lock:
+            if self._browser:
+                return
+            with metrics.timer("browser_launch"):
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=self.headless)
+                self._pool = asyncio.Queue()
+                for _ in range(self.pool_size):
+                    self._pool.put_nowait(await self._new_tab())
+
+    async def close(self):
+        """Closes the HTTP client, every pooled tab, the browser and the Playwright driver."""
+        if self.http:
+            await self.http.close()
+        self.scheduler.close()
+        if self._pool:
+            while not self._pool.empty():
+                tab = self._pool.get_nowait()
+                if tab:
+                    await self._close_tab(tab)
+            self._pool = None
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _new_tab(self):
+        with metrics.timer("tab_open"):
+            context = await self._browser.new_context(
                 viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+                user_agent=USER_AGENT
             )
-            
             page = await context.new_page()
-            await stealth_async(page) 
-            
-            # --- URL CONSTRUCTION ---
-            base_url = "https://scholar.google.com/scholar"
-            start_index = (page_num - 1) * 10
-            
-            # --- URL CONSTRUCTION ---
-            if advanced_params:
-                # MODE A: ADVANCED SEARCH (Manual Inputs)
-                # Google Scholar Advanced Search Parameters
-                params = {
-                    "start": start_index,
-                    "as_q": advanced_params.get("all_words", ""),       # All words
-                    "as_epq": advanced_params.get("exact_phrase", ""),  # Exact phrase
-                    "as_oq": advanced_params.get("at_least_one", ""),   # At least one
-                    "as_eq": advanced_params.get("without_words", ""),  # Without
-                    "as_occt": advanced_params.get("occurrence", "any"),# "any" or "title"
-                    "as_sauthors": advanced_params.get("author", ""),   # Author
-                    "as_publication": advanced_params.get("pub", ""),   # Publication
-                    "as_ylo": advanced_params.get("date_low", ""),      # Year Low
-                    "as_yhi": advanced_params.get("date_high", "")      # Year High
-                }
-                # Filter out empty keys to keep URL clean
-                clean_params = {k: v for k, v in params.items() if v}
-                final_url = f"{base_url}?{urlencode(clean_params)}"
-                
-            else:
-                # MODE B: STANDARD SEARCH (LLM Keywords)
-                params_str = f"?start={start_index}&q={query.replace(' ', '+')}"
-                
-                # Apply Preferences
-                if search_prefs.get("sort_by") == "date": params_str += "&scisbd=1"
-                if search_prefs.get("article_type") == "review": params_str += "&as_rr=1"
-                
-                # Apply Dynamic Years
-                if years and years.get("min"): params_str += f"&as_ylo={years['min']}"
-                if years and years.get("max"): params_str += f"&as_yhi={years['max']}"
-                
-                final_url = base_url + params_str
-            # ------------------------
+            await stealth_async(page)
+        return PooledTab(context, page)
+
+    async def _close_tab(self, tab):
+        try:
+            await tab.context.close()
+        except Exception:
+            pass
+
+    async def acquire(self):
+        """Waits for a free tab from the pool."""
+        if not self._browser:
+            await self.start()
+        tab = await self._pool.get()
+        if tab is None:
+            # A previous recycle failed; retry the launch now
+            try:
+                tab = await self._new_tab()
+            except Exception:
+                self._pool.put_nowait(None)
+                raise
+        return tab
 
+    async def release(self, tab, failed: bool = False):
+        """Returns a tab to the pool, swapping in a fresh one after an error or PAGE_MAX_USES loads."""
+        tab.uses += 1
+        if failed or tab.uses >= PAGE_MAX_USES:
+            await self._close_tab(tab)
             try:
+                tab = await self._new_tab()
+            except Exception as e:
+                print(f"Browser Error (recycling tab): {e}")
+                tab = None
+        self._pool.put_nowait(tab)
+
+    async def fetch_scholar_results(self, query: str, page_num: int, search_prefs: dict, years: dict, advanced_params: dict = None,
+                                    cites: str = None):
+        """
+        Fetches results. Supports both Standard (LLM) and Advanced (Manual) modes.
+        Tries plain HTTP first unless fetch_mode is "browser"; Chromium is only used
+        when that response has no results container (or fetch_mode says so).
+        """
+        final_url = build_scholar_url(query, page_num, search_prefs, years, advanced_params, self.base_url, cites)
+
+        if self.cache:
+            with metrics.timer("cache_get"):
+                cached = await asyncio.to_thread(self.cache.get, final_url)
+            if cached:
+                return cached
+
+        content = None
+        if self.http:
+            content = await self._fetch_http(query, final_url)
+            if content is None and self.fetch_mode == "http":
+                return None
+        if content is None:
+            content = await self._fetch_browser(query, final_url)
+
+        if content and self.cache:
+            await asyncio.to_thread(self.cache.put, final_url, content,
+                                    query=query, page=page_num, advanced=bool(advanced_params), cites=cites)
+        return content
+
+    async def _fetch_http(self, query: str, url: str):
+        with metrics.timer("rate_limit_wait"):
+            await self.scheduler.acquire()
+        try:
+            with metrics.timer("http_get"):
+                content = await self.http.fetch(url)
+        except (BlockedError, httpx.HTTPError) as e:
+            print(f"HTTP Error ({query}): {e}")
+            self.scheduler.record(False)
+            return None
+        if content:
+            self.scheduler.record(True)
+        return content
+
+    async def _fetch_browser(self, query: str, final_url: str):
+        try:
+            tab = await self.acquire()
+        except Exception as e:
+            print(f"Browser Error ({query}): {e}")
+            return None
+
+        page = tab.page
+        try:
+            with metrics.timer("rate_limit_wait"):
+                await self.scheduler.acquire()
+
+            with metrics.timer("goto"):
                 await page.goto(final_url, timeout=Global_TIMEOUT)
-                
-                if "gs_captcha" in page.url or "sorry" in page.url:
-                    print(f"⚠️ CAPTCHA detected for {query}! Waiting for manual solve...")
-                    await page.wait_for_timeout(30000)
-                
-                # Wait for results to load
+
+            if "gs_captcha" in page.url or "sorry" in page.url:
+                print(f"⚠️ CAPTCHA detected for {query}! Waiting for manual solve...")
+                self.scheduler.record(False)   # We're being throttled: slow everyone down
+                await page.wait_for_timeout(30000)
+
+            # Wait for results to load
+            with metrics.timer("wait_results"):
                 await page.wait_for_selector('#gs_res_ccl_mid', timeout=10000)
-                
-                # Human jitter (scroll down a bit)
-                await page.mouse.wheel(0, random.randint(300, 700))
+
+            # Human jitter (scroll down a bit)
+            await page.mouse.wheel(0, random.randint(300, 700))
+            with metrics.timer("human_delay"):
                 await asyncio.sleep(random.uniform(Human_DELAY_MIN, Human_DELAY_MAX))
-                
+
+            with metrics.timer("content"):
                 content = await page.content()
-                await browser.close()
-                return content
-                
-            except Exception as e:
-                print(f"Browser Error ({query}): {e}")
-                await browser.close()
-                return None
\ No newline at end of file
+            self.scheduler.record(True)
+            await self.release(tab)
+            return content
+
+        except Exception as e:
+            print(f"Browser Error ({query}): {e}")
+            self.scheduler.record(False)
+            await self.release(tab, failed=True)
+            return None
@@ -0,0 +1,151 @@
+# scraper/cache.py
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from config.settings import CACHE_DIR, CACHE_TTL_HOURS, CACHE_MAX_MB
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class HtmlCache:
+    """
+    Content-addressed store of fetched result pages, keyed by the final Scholar URL.
+
+    Each entry is one compressed file: a JSON header line (url, query, page, fetched_at)
+    followed by the raw HTML. File mtime tracks last use for LRU eviction.
+    """
+    def __init__(self, cache_dir: str = CACHE_DIR, ttl_hours: float = CACHE_TTL_HOURS, max_mb: float = CACHE_MAX_MB):
+        self.cache_dir = cache_dir
+        self.ttl = ttl_hours * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ext = ".zst" if zstandard else ".gz"
+        self._size = None   # Lazily computed total bytes on disk
+        self._lock = threading.Lock()   # get/put run in worker threads (asyncio.to_thread)
+
+    # --- FILE FORMAT ---
+    @staticmethod
+    def _compress(data: bytes, ext: str) -> bytes:
+        if ext == ".zst":
+            return zstandard.ZstdCompressor(level=6).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    @staticmethod
+    def _decompress(data: bytes, ext: str) -> bytes:
+        if ext == ".zst":
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key + self.ext)
+
+    def _read(self, path: str):
+        ext = os.path.splitext(path)[1]
+        if ext == ".zst" and not zstandard:
+            return None, None
+        with open(path, "rb") as f:
+            raw = self._decompress(f.read(), ext)
+        header, _, html = raw.partition(b"\n")
+        return json.loads(header), html.decode("utf-8")
+
+    def _files(self):
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith((".gz", ".zst")):
+                    yield os.path.join(root, name)
+
+    # --- PUBLIC API ---
+    def get(self, url: str):
+        """Returns cached HTML for this URL, or None on a miss / expired entry."""
+        path = self._path(url)
+        if not os.path.exists(path):
+            return None
+        try:
+            meta, html = self._read(path)
+        except Exception:
+            self._remove(path)
+            return None
+        if meta is None:
+            return None
+        if self.ttl and time.time() - meta.get("fetched_at", 0) > self.ttl:
+            self._remove(path)
+            return None
+        os.utime(path)   # Mark as recently used
+        return html
+
+    def put(self, url: str, html: str, **meta):
+        """Stores a page; extra keyword args (query, page, ...) are kept in the header for replay."""
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        header = json.dumps({"url": url, "fetched_at": time.time(), **meta}).encode("utf-8")
+        blob = self._compress(header + b"\n" + html.encode("utf-8"), self.ext)
+
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+
+        with self._lock:
+            # Sized before the new file lands, so the first put doesn't count it twice
+            size = self._disk_size()
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp, path)
+            self._size = size - old_size + len(blob)
+            if self.max_bytes and self._size > self.max_bytes:
+                self._evict()
+
+    def entries(self):
+        """Yields (meta, html) for every stored page, expired or not. Used by replay mode."""
+        for path in self._files():
+            try:
+                meta, html = self._read(path)
+            except Exception:
+                continue
+            if meta is not None:
+                yield meta, html
+
+    def size(self) -> int:
+        with self._lock:
+            return self._disk_size()
+
+    def evict(self):
+        """Drops least-recently-used entries until the cache is back under 90% of its cap."""
+        with self._lock:
+            self._evict()
+
+    # Callers of the helpers below hold self._lock
+    def _disk_size(self) -> int:
+        if self._size is None:
+            self._size = sum(os.path.getsize(p) for p in self._files()) if os.path.isdir(self.cache_dir) else 0
+        return self._size
+
+    def _evict(self):
+        files = sorted(self._files(), key=os.path.getmtime)
+        target = self.max_bytes * 0.9
+        size = sum(os.path.getsize(p) for p in files)
+        for path in files:
+            if size <= target:
+                break
+            size -= self._unlink(path)
+        self._size = size
+
+    @staticmethod
+    def _unlink(path: str) -> int:
+        """Deletes a cache file; returns the bytes freed (0 if it was already gone)."""
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            return size
+        except OSError:
+            return 0
+
+    def _remove(self, path: str):
+        with self._lock:
+            size = self._unlink(path)
+            if self._size is not None:
+                self._size = max(self._size - size, 0)
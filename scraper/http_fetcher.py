@@ -0,0 +1,63 @@
+# scraper/http_fetcher.py
+import httpx
+from config.settings import HTTP_TIMEOUT, HTTP_MAX_CONNECTIONS
+
+try:
+    import h2  # noqa: F401  (httpx only speaks HTTP/2 when the h2 package is installed)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+RESULTS_CONTAINER = 'id="gs_res_ccl_mid"'   # Same element the browser path waits for
+
+HEADERS = {
+    "User-Agent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+class BlockedError(Exception):
+    """Scholar answered with a captcha / rate-limit page instead of results."""
+
+
+class HttpFetcher:
+    """
+    Plain HTTP fetches over one pooled httpx client (keep-alive, HTTP/2 when available).
+    The parser only needs the static results HTML, so most pages never need Chromium.
+    """
+    def __init__(self, timeout: float = HTTP_TIMEOUT, max_connections: int = HTTP_MAX_CONNECTIONS):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                headers=HEADERS,
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections)
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch(self, url: str):
+        """
+        Returns the page HTML if it holds the results container, None if it doesn't
+        (the caller falls back to the browser). Raises BlockedError on captcha / 429.
+        """
+        response = await self._get_client().get(url)
+        html = response.text
+        if response.status_code == 200 and RESULTS_CONTAINER in html:
+            return html
+        if response.status_code == 429 or "sorry" in str(response.url) or "gs_captcha" in html:
+            raise BlockedError(f"HTTP {response.status_code} from {response.url}")
+        response.raise_for_status()
+        return None
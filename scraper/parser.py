@@ -1,49 +1,246 @@
 from bs4 import BeautifulSoup
 import re
+from typing import NamedTuple, Optional
+from config.settings import PARSER_BACKEND
+
+# Optional faster backends; BeautifulSoup is always available as the fallback
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxHTML
+except ImportError:
+    SelectolaxHTML = None
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+# Shared by every backend (the year lives in the green .gs_a metadata line)
+YEAR_RE = re.compile(r'\b(19|20)\d{2}\b')
+# .gs_a reads "authors - venue, year - host"; Scholar puts a no-break space before each dash
+META_SEP_RE = re.compile(r'\s+-\s+')
+VENUE_YEAR_RE = re.compile(r',?\s*\b(?:19|20)\d{2}\s*$')
+# .gs_fl footer links: "Cited by N" (cites=<cluster>) and "All N versions" (cluster=<cluster>)
+CITES_RE = re.compile(r'[?&]cites=(\d+)')
+CLUSTER_RE = re.compile(r'[?&]cluster=(\d+)')
+CITED_BY_RE = re.compile(r'(\d+)')
+
+
+def _class_xpath(cls: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+
+
+if lxml:
+    _X_RESULTS = etree.XPath(f"//*[{_class_xpath('gs_ri')}]")
+    _X_TITLE = etree.XPath(f".//*[{_class_xpath('gs_rt')}]")
+    _X_LINK = etree.XPath(f".//*[{_class_xpath('gs_rt')}]//a")
+    _X_SNIPPET = etree.XPath(f".//*[{_class_xpath('gs_rs')}]")
+    _X_META = etree.XPath(f".//*[{_class_xpath('gs_a')}]")
+    _X_FOOTER_LINKS = etree.XPath(f".//*[{_class_xpath('gs_fl')}]//a")
+
+
+def _clean_title(text: str) -> str:
+    return text.replace('[PDF]', '').replace('[HTML]', '').strip()
+
+
+class Paper(NamedTuple):
+    """One parsed result. A plain tuple underneath: no per-record dict, cheap to pickle across the parse pool."""
+    title: str
+    url: str
+    snippet: str
+    keyword: str
+    year: Optional[int]
+    authors: tuple = ()              # As printed, e.g. ("A Vaswani", "N Shazeer"); long lists end early
+    venue: Optional[str] = None      # Journal / conference / "arXiv preprint ..."
+    publisher: Optional[str] = None  # Host the result links to, e.g. "nature.com"
+    cited_by: int = 0
+    cluster_id: Optional[str] = None # Scholar's id for every version of the paper (exact-dedup key)
+
+
+PAPER_FIELDS = Paper._fields
+
+
+def _clean_meta_part(text: str) -> str:
+    return text.strip().strip('…').strip()
+
+
+def parse_meta(meta_text: str):
+    """
+    (authors, venue, publisher) from a .gs_a line; parts Scholar left out come back empty/None.
+    A venue Scholar cut short ("Proceedings of the …") is None too: the prefix would become a bogus venue.
+    """
+    parts = META_SEP_RE.split(meta_text.strip())
+    authors = tuple(a for a in (_clean_meta_part(x) for x in parts[0].split(',')) if a) if parts[0] else ()
+    venue = publisher = None
+    if len(parts) >= 3:
+        venue, publisher = parts[1], parts[-1]
+    elif len(parts) == 2:
+        # "authors - host" or "authors - venue, year": a bare host has a dot and no spaces
+        if '.' in parts[1] and ' ' not in parts[1].strip():
+            publisher = parts[1]
+        else:
+            venue = parts[1]
+    if venue is not None:
+        venue = VENUE_YEAR_RE.sub('', venue).strip()
+        venue = None if venue.endswith('…') else _clean_meta_part(venue) or None
+    if publisher is not None:
+        publisher = _clean_meta_part(publisher) or None
+    return authors, venue, publisher
+
+
+def parse_footer(links) -> tuple:
+    """(cited_by, cluster_id) from the (href, text) pairs of a result's .gs_fl footer."""
+    cited_by, cluster_id = 0, None
+    for href, text in links:
+        m = CITES_RE.search(href)
+        if m:
+            cluster_id = m.group(1)
+            count = CITED_BY_RE.search(text)
+            cited_by = int(count.group(1)) if count else 0
+        elif cluster_id is None:
+            m = CLUSTER_RE.search(href)
+            if m:
+                cluster_id = m.group(1)
+    return cited_by, cluster_id
+
+
+def _make_paper(title, url, snippet, meta_text, source_keyword, footer_links=()):
+    year_match = YEAR_RE.search(meta_text)
+    authors, venue, publisher = parse_meta(meta_text)
+    cited_by, cluster_id = parse_footer(footer_links)
+    return Paper(title, url, snippet, source_keyword, int(year_match.group(0)) if year_match else None,
+                 authors, venue, publisher, cited_by, cluster_id)
+
+
+def available_backends() -> list:
+    """Backends importable in this environment, fastest first."""
+    backends = []
+    if SelectolaxHTML: backends.append("selectolax")
+    if lxml: backends.append("lxml")
+    backends.append("bs4")
+    return backends
+
 
 class ScholarParser:
+    def __init__(self, backend: str = PARSER_BACKEND):
+        # "auto" (or a backend that isn't installed) picks the fastest one available
+        available = available_backends()
+        self.backend = backend if backend in available else available[0]
+        self._parse = getattr(self, f"_parse_{self.backend}")
+
     def parse_html(self, html_content: str, source_keyword: str):
         """
         Extracts a list of paper dictionaries from raw HTML.
         """
+        return [paper._asdict() for paper in self.iter_papers(html_content, source_keyword)]
+
+    def parse_rows(self, html_content: str, source_keyword: str):
+        """Same as parse_html but returns Paper records."""
+        return list(self.iter_papers(html_content, source_keyword))
+
+    def parse_page(self, html_content: str, source_keyword: str):
+        """
+        (result_count, papers) from one parse. result_count is every result block on the page,
+        linked or not: citation-only entries have no URL but still fill one of the page's slots.
+        """
         if not html_content:
-            return []
-            
+            return 0, []
+        blocks = list(self._parse(html_content, source_keyword))
+        return len(blocks), [paper for paper in blocks if paper is not None]
+
+    def iter_papers(self, html_content: str, source_keyword: str):
+        """Yields Paper records as the result blocks are walked."""
+        if not html_content:
+            return iter(())
+        return (paper for paper in self._parse(html_content, source_keyword) if paper is not None)
+
+    # Backends yield one item per result block: a Paper, or None for a block that gave no paper
+
+    def _parse_bs4(self, html_content, source_keyword):
         soup = BeautifulSoup(html_content, 'html.parser')
-        papers = []
-        
+
         # Google Scholar results are usually in div.gs_ri
-        results = soup.select('.gs_ri')
-        
-        for item in results:
+        for item in soup.select('.gs_ri'):
             try:
-                # Extract Title
                 title_tag = item.select_one('.gs_rt')
-                title = title_tag.text.replace('[PDF]', '').replace('[HTML]', '').strip() if title_tag else "Unknown"
-                
-                # Extract Link
                 link_tag = item.select_one('.gs_rt a')
-                url = link_tag['href'] if link_tag else None
-                
-                # Extract Snippet (Abstract fragment)
                 snippet_tag = item.select_one('.gs_rs')
-                snippet = snippet_tag.text.strip() if snippet_tag else ""
-                
-                # Extract Year (Regex search in the green metadata line)
                 meta_tag = item.select_one('.gs_a')
-                meta_text = meta_tag.text if meta_tag else ""
-                year_match = re.search(r'\b(19|20)\d{2}\b', meta_text)
-                year = year_match.group(0) if year_match else "Unknown"
-
-                if url: # Only save if we have a link
-                    papers.append({
-                        "title": title,
-                        "url": url,
-                        "snippet": snippet,
-                        "keyword": source_keyword,
-                        "year": year
-                    })
+
+                url = link_tag['href'] if link_tag else None
+                if not url: # Only save if we have a link
+                    yield None
+                    continue
+                paper = _make_paper(
+                    _clean_title(title_tag.text) if title_tag else "Unknown",
+                    url,
+                    snippet_tag.text.strip() if snippet_tag else "",
+                    meta_tag.text if meta_tag else "",
+                    source_keyword,
+                    [(a.get('href', ''), a.text) for a in item.select('.gs_fl a')]
+                )
             except Exception:
-                continue
-                
-        return papers
\ No newline at end of file
+                paper = None
+            yield paper
+
+    def _parse_lxml(self, html_content, source_keyword):
+        root = lxml.html.document_fromstring(html_content)
+
+        for item in _X_RESULTS(root):
+            try:
+                title_tags = _X_TITLE(item)
+                link_tags = _X_LINK(item)
+                snippet_tags = _X_SNIPPET(item)
+                meta_tags = _X_META(item)
+
+                url = link_tags[0].get('href') if link_tags else None
+                if not url:
+                    yield None
+                    continue
+                paper = _make_paper(
+                    _clean_title(title_tags[0].text_content()) if title_tags else "Unknown",
+                    url,
+                    snippet_tags[0].text_content().strip() if snippet_tags else "",
+                    meta_tags[0].text_content() if meta_tags else "",
+                    source_keyword,
+                    [(a.get('href') or '', a.text_content()) for a in _X_FOOTER_LINKS(item)]
+                )
+            except Exception:
+                paper = None
+            yield paper
+
+    def _parse_selectolax(self, html_content, source_keyword):
+        tree = SelectolaxHTML(html_content)
+
+        for item in tree.css('.gs_ri'):
+            try:
+                title_tag = item.css_first('.gs_rt')
+                link_tag = item.css_first('.gs_rt a')
+                snippet_tag = item.css_first('.gs_rs')
+                meta_tag = item.css_first('.gs_a')
+
+                url = link_tag.attributes.get('href') if link_tag else None
+                if not url:
+                    yield None
+                    continue
+                paper = _make_paper(
+                    _clean_title(title_tag.text()) if title_tag else "Unknown",
+                    url,
+                    snippet_tag.text().strip() if snippet_tag else "",
+                    meta_tag.text() if meta_tag else "",
+                    source_keyword,
+                    [(a.attributes.get('href') or '', a.text()) for a in item.css('.gs_fl a')]
+                )
+            except Exception:
+                paper = None
+            yield paper
+
+
+_worker_parsers = {}
+
+def parse_page(html_content: str, source_keyword: str, backend: str = PARSER_BACKEND):
+    """Module-level entry point for executors: reuses one parser per backend in each worker process."""
+    parser = _worker_parsers.get(backend)
+    if parser is None:
+        parser = _worker_parsers[backend] = ScholarParser(backend)
+    return parser.parse_page(html_content, source_keyword)
@@ -0,0 +1,154 @@
+# scraper/scheduler.py
+import asyncio
+import random
+import sqlite3
+import threading
+import time
+from config.settings import (
+    REQUESTS_PER_MINUTE, MIN_REQUESTS_PER_MINUTE, REQUEST_BURST,
+    RETRY_BASE_DELAY, RETRY_MAX_DELAY
+)
+
+
+class RequestScheduler:
+    """
+    Global pacing shared by every worker: a token bucket sets the polite request rate,
+    and AIMD adapts that rate (slow additive climb on success, halve on errors/timeouts).
+    """
+    def __init__(self, per_minute: float = REQUESTS_PER_MINUTE, min_per_minute: float = MIN_REQUESTS_PER_MINUTE,
+                 burst: int = REQUEST_BURST, retry_base: float = RETRY_BASE_DELAY, retry_max: float = RETRY_MAX_DELAY):
+        self.max_rate = per_minute / 60.0
+        self.min_rate = min_per_minute / 60.0
+        self.rate = self.max_rate                  # Current tokens per second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.increase = self.max_rate / 20         # Additive step: back to full speed after ~20 good fetches
+        self.decrease = 0.5                        # Multiplicative factor on failure
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()                # Waiters are served in arrival order
+        self.successes = 0
+        self.failures = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Waits until the bucket allows one more request."""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def record(self, success: bool):
+        """Feeds a fetch outcome back into the rate (AIMD)."""
+        self._refill()
+        if success:
+            self.successes += 1
+            self.rate = min(self.max_rate, self.rate + self.increase)
+        else:
+            self.failures += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            # Drain the bucket too, so the slowdown is immediate rather than after the burst
+            self.tokens = min(self.tokens, 0.0)
+
+    def retry_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the given (1-based) attempt."""
+        return random.uniform(0, min(self.retry_max, self.retry_base * 2 ** (attempt - 1)))
+
+    def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_min": round(self.rate * 60, 2),
+            "successes": self.successes,
+            "failures": self.failures
+        }
+
+
+class SharedRequestScheduler(RequestScheduler):
+    """
+    The same token bucket + AIMD, but the bucket lives in a SQLite table so every worker
+    process on the host draws from one budget (they share one IP, so they share one limit).
+    Each take/adjust is a short BEGIN IMMEDIATE transaction run off the event loop.
+    """
+    def __init__(self, db_path: str, name: str = "scholar", **kwargs):
+        super().__init__(**kwargs)
+        self.name = name
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                rate REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+        self._conn.execute("INSERT OR IGNORE INTO rate_limits VALUES (?, ?, ?, ?)",
+                           (name, float(self.burst), self.max_rate, time.time()))
+        self._db_lock = threading.Lock()
+
+    def _transact(self, update):
+        """Loads the shared bucket, refills it, applies update(tokens, rate) -> (tokens, rate, result)."""
+        with self._db_lock:
+            if self._conn is None:      # Closed; a late fire-and-forget adjust
+                return None
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                tokens, rate, updated = self._conn.execute(
+                    "SELECT tokens, rate, updated FROM rate_limits WHERE name = ?", (self.name,)
+                ).fetchone()
+                now = time.time()
+                rate = min(self.max_rate, rate)    # The setting may have been lowered since
+                tokens = min(self.burst, tokens + max(0.0, now - updated) * rate)
+                tokens, rate, result = update(tokens, rate)
+                self._conn.execute("UPDATE rate_limits SET tokens = ?, rate = ?, updated = ? WHERE name = ?",
+                                   (tokens, rate, now, self.name))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        self.rate = rate
+        return result
+
+    def _take(self, tokens, rate):
+        if tokens >= 1:
+            return tokens - 1, rate, 0.0
+        return tokens, rate, (1 - tokens) / rate
+
+    def _adjust(self, success):
+        def update(tokens, rate):
+            if success:
+                return tokens, min(self.max_rate, rate + self.increase), None
+            return min(tokens, 0.0), max(self.min_rate, rate * self.decrease), None
+        self._transact(update)
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                wait = await asyncio.to_thread(self._transact, self._take)
+                if not wait:
+                    return
+                await asyncio.sleep(wait)
+
+    def record(self, success: bool):
+        if success:
+            self.successes += 1
+        else:
+            self.failures += 1
+        # Fire and forget: the shared rate is updated off the loop
+        asyncio.get_running_loop().run_in_executor(None, self._adjust, success)
+
+    def close(self):
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
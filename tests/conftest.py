@@ -0,0 +1,32 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+# The repo is a set of top-level packages run from its root (python main.py), not an installed package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """A fresh DB file; cwd moves to tmp_path so prefs/metrics files stay out of the repo."""
+    monkeypatch.chdir(tmp_path)
+    return str(tmp_path / "test.db")
+
+
+@pytest.fixture(scope="session")
+def stub():
+    """The offline Scholar stand-in from the benchmarks: 2 full pages per query, then a short one."""
+    from benchmarks.stub_server import StubScholar
+    with StubScholar(depth=2) as server:
+        yield server
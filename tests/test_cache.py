@@ -0,0 +1,44 @@
+# tests/test_cache.py
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from scraper.cache import HtmlCache
+
+
+def disk_size(path) -> int:
+    return sum(os.path.getsize(os.path.join(root, n)) for root, _, names in os.walk(path) for n in names)
+
+
+def test_put_get_and_replay(tmp_path):
+    cache = HtmlCache(str(tmp_path), ttl_hours=0, max_mb=0)
+    cache.put("http://x/scholar?q=a", "<html>a</html>", query="a", page=1)
+    assert cache.get("http://x/scholar?q=a") == "<html>a</html>"
+    assert cache.get("http://x/scholar?q=b") is None
+    [(meta, html)] = list(cache.entries())
+    assert (meta["query"], meta["page"], html) == ("a", 1, "<html>a</html>")
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = HtmlCache(str(tmp_path), ttl_hours=1)
+    cache.put("u", "<html></html>")
+    os.utime(cache._path("u"))
+    cache.ttl = 1e-9
+    time.sleep(0.01)
+    assert cache.get("u") is None
+    assert cache.size() == 0 == disk_size(tmp_path)
+
+
+def test_size_matches_disk(tmp_path):
+    HtmlCache(str(tmp_path)).put("old", "<html>old</html>")
+    cache = HtmlCache(str(tmp_path))       # Size unknown until the first put scans the directory
+    cache.put("new", "<html>new</html>")
+    cache.put("new", "<html>newer</html>")
+    assert cache.size() == disk_size(tmp_path)
+
+
+def test_concurrent_puts_stay_under_the_cap(tmp_path):
+    cache = HtmlCache(str(tmp_path), max_mb=0.02)
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda i: cache.put(f"u{i}", os.urandom(3000).hex()), range(100)))
+    assert cache.size() == disk_size(tmp_path) <= cache.max_bytes
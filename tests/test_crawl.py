@@ -0,0 +1,77 @@
+# tests/test_crawl.py
+"""End-to-end crawls against the offline Scholar stand-in (benchmarks/stub_server.py): plain HTTP, no browser."""
+import asyncio
+import sqlite3
+
+from core.database import ResearchDatabase
+from core.job_store import open_job_store, SqliteJobStore
+from main import ScholarEngine, build_topic_jobs
+from scraper.browser import StealthBrowser
+from scraper.scheduler import RequestScheduler
+
+
+def make_engine(db_path, base_url, cited_by=(0, 0)):
+    engine = ScholarEngine()
+    engine.db = ResearchDatabase(db_path)
+    engine.jobs = open_job_store(engine.db)
+    engine.browser = StealthBrowser(pool_size=2, fetch_mode="http", base_url=base_url)
+    engine.browser.cache = None
+    engine.browser.scheduler = RequestScheduler(per_minute=1_000_000, burst=2, retry_base=0.01, retry_max=0.05)
+    engine.citation_depth, engine.citation_budget = cited_by
+    return engine
+
+
+async def crawl(engine, jobs):
+    await engine.start()
+    try:
+        return await engine.crawl(jobs, lambda event: None)
+    finally:
+        await engine.shutdown()
+
+
+def test_crawl_follows_pages_until_a_short_page(db_path, stub):
+    engine = make_engine(db_path, stub.base_url)
+    totals = asyncio.run(crawl(engine, build_topic_jobs(["query one", "query two"], 5, {})))
+
+    # Two full pages and the short one per query
+    assert (totals["pages"], totals["failed"]) == (6, 0)
+    assert totals["new"] == totals["found"] == 2 * (9 + 9 + 4)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0] == totals["new"]
+    assert conn.execute("SELECT COUNT(*) FROM crawl_jobs WHERE state = 'done'").fetchone()[0] == 6
+    assert conn.execute("SELECT COUNT(*) FROM paper_authors").fetchone()[0] > 0
+    conn.close()
+
+
+def test_finished_jobs_are_not_crawled_again(db_path, stub):
+    jobs = build_topic_jobs(["query one"], 5, {})
+    asyncio.run(crawl(make_engine(db_path, stub.base_url), jobs))
+    totals = asyncio.run(crawl(make_engine(db_path, stub.base_url), jobs))
+    assert totals["pages"] == 0
+
+
+def test_max_pages_caps_the_crawl(db_path, stub):
+    totals = asyncio.run(crawl(make_engine(db_path, stub.base_url), build_topic_jobs(["query one"], 1, {})))
+    assert totals["pages"] == 1
+
+
+def test_cited_by_expansion_respects_the_budget(db_path, stub):
+    engine = make_engine(db_path, stub.base_url, cited_by=(1, 3))
+    totals = asyncio.run(crawl(engine, build_topic_jobs(["query one"], 1, {})))
+
+    assert totals["pages"] == 1 + 3
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(DISTINCT cited_cluster) FROM citations").fetchone()[0] == 3
+    assert conn.execute("SELECT COUNT(*) FROM crawl_jobs WHERE query = 'Cited by'").fetchone()[0] == 3
+    conn.close()
+
+
+def test_transient_errors_are_retried(db_path):
+    from benchmarks.stub_server import StubScholar
+    engine = make_engine(db_path, None)
+    engine.jobs = SqliteJobStore(engine.db, max_attempts=20)    # 30% of requests fail; none should for good
+    with StubScholar(error_rate=0.3, depth=2) as flaky:
+        engine.browser.base_url = flaky.base_url
+        totals = asyncio.run(crawl(engine, build_topic_jobs(["query one"], 5, {})))
+    assert (totals["pages"], totals["failed"]) == (3, 0)
+    assert totals["new"] == 9 + 9 + 4
@@ -0,0 +1,175 @@
+# tests/test_database.py
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from core import database
+from core.database import ResearchDatabase
+from core.job_store import SqliteJobStore
+from scraper.parser import Paper
+
+# What each schema version adds, in order (v1 also turns a TEXT year into INTEGER)
+STEPS = [database.SCHEMA_V1_READ_LAYER, database.SCHEMA_V2_ALIASES, database.SCHEMA_V3_JOB_BACKOFF,
+         database.SCHEMA_V4_JOB_LEASES, database.SCHEMA_V5_CITATIONS]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def legacy_db(path: str, version: int):
+    """A DB as an older release left it: v0 tables with a TEXT year, then the first `version` upgrades."""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE papers (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, url TEXT UNIQUE,
+                             snippet TEXT, keyword_source TEXT, year TEXT,
+                             scraped_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE crawl_jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, query TEXT NOT NULL, page INTEGER NOT NULL,
+                                 filters TEXT NOT NULL, payload TEXT NOT NULL, state TEXT NOT NULL DEFAULT 'pending',
+                                 attempts INTEGER NOT NULL DEFAULT 0, last_error TEXT,
+                                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                                 updated_at DATETIME DEFAULT CURRENT_TIMESTAMP, UNIQUE (query, page, filters));
+        INSERT INTO papers (title, url, snippet, keyword_source, year) VALUES
+            ('Attention is all you need', 'u1', 'transformer', 'nlp', '2017'),
+            ('Old scan', 'u2', 'no date', 'nlp', 'Unknown');
+    """)
+    for n, script in enumerate(STEPS[:version], 1):
+        if n == 1:
+            script = database.REBUILD_PAPERS_YEAR_INT + script
+        conn.executescript(f"BEGIN; {script} PRAGMA user_version = {n}; COMMIT;")
+    conn.close()
+
+
+# --- MIGRATIONS ---
+@pytest.mark.parametrize("version", range(len(STEPS)))
+def test_migrate_to_latest(db_path, version):
+    legacy_db(db_path, version)
+
+    async def upgrade():
+        db = ResearchDatabase(db_path)
+        await db.init_db()
+        await db.init_db()      # A second start is a no-op
+        assert await db.save_papers([Paper("New", "u3", "s", "kw", 2024, ("A B",), "Nature", cluster_id="9")]) == 1
+        await db.close()
+    run(upgrade())
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == database.SCHEMA_VERSION
+    assert conn.execute("SELECT url, year FROM papers ORDER BY id").fetchall() == [("u1", 2017), ("u2", None), ("u3", 2024)]
+    assert conn.execute("SELECT rowid FROM papers_fts WHERE papers_fts MATCH 'transformer'").fetchall() == [(1,)]
+    assert conn.execute("SELECT value FROM paper_stats WHERE name = 'papers'").fetchone()[0] == 3
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(crawl_jobs)")}
+    assert {"available_at", "leased_by", "lease_expires"} <= columns
+    assert conn.execute("SELECT cluster_id FROM papers WHERE url = 'u3'").fetchone()[0] == "9"
+    conn.close()
+
+
+# --- PAPERS ---
+def test_save_papers_normalizes_authors_and_venues(db_path):
+    async def scenario():
+        db = ResearchDatabase(db_path)
+        await db.init_db()
+        papers = [Paper("T1", "u1", "s", "kw", 2020, ("A", "B"), "Nature", "nature.com", 5, "1"),
+                  Paper("T2", None, "s", "kw", 2021, ("B",), "Nature", None, 0, "2")]
+        assert await db.save_papers(papers, [("1", "2")]) == 2
+        assert await db.save_papers(papers) == 0
+        await db.close()
+    run(scenario())
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT p.title, v.name, GROUP_CONCAT(a.name) FROM papers p
+        JOIN venues v ON v.id = p.venue_id
+        JOIN paper_authors pa ON pa.paper_id = p.id JOIN authors a ON a.id = pa.author_id
+        GROUP BY p.id ORDER BY p.id
+    """).fetchall()
+    assert rows == [("T1", "Nature", "A,B"), ("T2", "Nature", "B")]
+    assert conn.execute("SELECT cited_cluster, citing_cluster FROM citations").fetchall() == [("1", "2")]
+    conn.close()
+
+
+def test_background_writer_reports_failures(db_path):
+    async def scenario():
+        db = ResearchDatabase(db_path)
+        await db.init_db()
+        db.start_writer()
+        assert await db.queue_papers([Paper("T1", "u1", "s", "kw", 2020)]) == 1
+        with pytest.raises(sqlite3.Error):
+            await db.queue_papers([Paper("T2", "u2", "s", "kw", 2020)], [("not a pair",)])
+        # The writer is still alive after a failed page
+        assert await db.queue_papers([Paper("T3", "u3", "s", "kw", 2020)]) == 1
+        await db.close()
+    run(scenario())
+
+
+# --- JOB LEASING ---
+def test_lease_heartbeat_complete(db_path):
+    async def scenario():
+        db = ResearchDatabase(db_path)
+        await db.init_db()
+        store = SqliteJobStore(db, lease_seconds=60)
+        assert await store.enqueue([{'query': 'q', 'page': 1}, {'query': 'q', 'page': 1}]) == 1
+
+        job_id, job, attempt = await store.lease("w1")
+        assert (job['query'], attempt) == ('q', 1)
+        assert await store.lease("w2") is None                  # Held by w1
+        assert await store.heartbeat("w1", [job_id]) == 1
+        assert await store.heartbeat("w2", [job_id]) == 0       # Not w2's lease
+
+        added = await store.complete(job_id, [{'query': 'q', 'page': 2}])
+        assert added == [{'query': 'q', 'page': 2}]
+        assert await store.count('done') == 1
+        assert await store.enqueue([{'query': 'q', 'page': 1}]) == 0   # Done jobs aren't redone
+        await db.close()
+    run(scenario())
+
+
+def test_expired_lease_is_handed_to_another_worker(db_path):
+    async def scenario():
+        db = ResearchDatabase(db_path)
+        await db.init_db()
+        store = SqliteJobStore(db, lease_seconds=0.05)
+        await store.enqueue([{'query': 'q', 'page': 1}])
+        job_id, _, _ = await store.lease("dead")
+        await asyncio.sleep(0.1)
+        assert (await store.lease("w2"))[::2] == (job_id, 2)
+        await db.close()
+    run(scenario())
+
+
+def test_failed_jobs_back_off_then_give_up(db_path):
+    async def scenario():
+        db = ResearchDatabase(db_path)
+        await db.init_db()
+        store = SqliteJobStore(db, lease_seconds=60, max_attempts=2)
+        await store.enqueue([{'query': 'q', 'page': 1}])
+        job_id, _, _ = await store.lease("w")
+        assert await store.fail(job_id, "503", retry_delay=30) == 'pending'
+        assert await store.lease("w") is None                   # Still backing off
+        assert await store.next_ready_time() > time.time()
+        conn = await db.connect()
+        await conn.execute("UPDATE crawl_jobs SET available_at = 0")
+        await conn.commit()
+        job_id, _, attempt = await store.lease("w")
+        assert attempt == 2
+        assert await store.fail(job_id, "503") == 'failed'
+        assert await store.enqueue([{'query': 'q', 'page': 1}]) == 1   # A failed job can be queued afresh
+        await db.close()
+    run(scenario())
+
+
+def test_cited_by_jobs_are_keyed_on_the_cluster(db_path):
+    async def scenario():
+        db = ResearchDatabase(db_path)
+        await db.init_db()
+        store = SqliteJobStore(db)
+        await store.enqueue([{'query': 'q', 'page': 1}])
+        job_id, _, _ = await store.lease("w")
+        cites = {'query': 'Cited by', 'page': 1, 'years': {}, 'cites': '42', 'prefs': {'sort_by': 'relevance'}}
+        added = await store.complete(job_id, [cites, {**cites, 'prefs': {'sort_by': 'date'}}])
+        assert added == [cites]
+        assert await db.expanded_clusters() == {'42'}
+        await db.close()
+    run(scenario())
@@ -0,0 +1,108 @@
+# tests/test_dedup.py
+import asyncio
+import sqlite3
+
+import pytest
+
+from core.database import ResearchDatabase
+from core.job_store import open_job_store
+from core.dedup import PaperDeduper, normalize_title
+from main import ScholarEngine
+from scraper.parser import Paper
+
+TITLE = "Deep residual learning for image recognition"
+SNIPPET = "We present a residual learning framework to ease the training of networks that are substantially deeper"
+
+
+def paper(url, title=TITLE, snippet=SNIPPET, cluster_id=None):
+    return Paper(title, url, snippet, "kw", 2016, cluster_id=cluster_id)
+
+
+def test_normalize_title():
+    assert normalize_title("[PDF] Déjà-vu: Learning, Fast!") == "deja vu learning fast"
+
+
+def test_same_paper_under_another_url_is_an_alias():
+    deduper = PaperDeduper()
+    assert deduper.filter([paper("a")]) == ([paper("a")], [])
+    unique, aliases = deduper.filter([paper("b", title="[PDF] " + TITLE)])
+    assert unique == []
+    assert aliases == [("b", "a", 1.0)]
+
+
+def test_known_url_is_dropped_silently():
+    deduper = PaperDeduper()
+    deduper.filter([paper("a")])
+    assert deduper.filter([paper("a")]) == ([], [])
+
+
+def test_duplicates_within_one_batch():
+    unique, aliases = PaperDeduper().filter([paper("a"), paper("b")])
+    assert [p.url for p in unique] == ["a"]
+    assert [a[:2] for a in aliases] == [("b", "a")]
+
+
+def test_cluster_id_matches_whatever_the_text():
+    deduper = PaperDeduper()
+    deduper.filter([paper("a", cluster_id="1")])
+    unique, aliases = deduper.filter([paper("b", title="Something else entirely different", snippet="x", cluster_id="1")])
+    assert unique == [] and aliases == [("b", "a", 1.0)]
+
+
+def test_different_clusters_are_never_merged():
+    deduper = PaperDeduper()
+    unique, aliases = deduper.filter([paper("a", cluster_id="1"), paper("b", cluster_id="2")])
+    assert [p.url for p in unique] == ["a", "b"] and aliases == []
+
+
+def test_shared_stock_title_needs_similar_text():
+    deduper = PaperDeduper()
+    deduper.filter([paper("a", title="A survey of deep learning methods",
+                          snippet="We review protein structure prediction, from homology modelling and threading "
+                                  "to end-to-end networks that predict folds from multiple sequence alignments")])
+    unique, _ = deduper.filter([paper("b", title="A survey of deep learning methods",
+                                      snippet="Perception for autonomous driving: camera and lidar object detection, "
+                                              "sensor fusion, tracking and motion forecasting in urban traffic")])
+    assert [p.url for p in unique] == ["b"]
+
+
+def test_match_leaves_the_index_alone_until_commit():
+    deduper = PaperDeduper()
+    unique, _, entries = deduper.match([paper("a")])
+    assert len(deduper) == 0
+    # Retrying the same page after a failed write must not see it as a duplicate
+    assert deduper.match([paper("a")])[0] == unique
+    deduper.commit(entries)
+    assert len(deduper) == 1
+    assert deduper.match([paper("a")])[0] == []
+
+
+def test_warm_loads_stored_papers():
+    deduper = PaperDeduper()
+    deduper.warm([("a", TITLE, SNIPPET, None)])
+    assert deduper.filter([paper("b")])[1] == [("b", "a", 1.0)]
+
+
+# --- CONCURRENT SAVES ---
+def saved_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = (conn.execute("SELECT url FROM papers").fetchall(), conn.execute("SELECT url FROM paper_aliases").fetchall())
+    conn.close()
+    return rows
+
+
+@pytest.mark.parametrize("cluster_id", [None, "77"])
+def test_pages_saved_at_once_see_each_other(db_path, cluster_id):
+    async def scenario():
+        engine = ScholarEngine()
+        engine.db = ResearchDatabase(db_path)
+        engine.jobs = open_job_store(engine.db)
+        await engine.start(launch_browser=False)
+        try:
+            return await asyncio.gather(engine.save_page([paper("arxiv", cluster_id=cluster_id)]),
+                                        engine.save_page([paper("nips", cluster_id=cluster_id)]))
+        finally:
+            await engine.shutdown()
+
+    assert sorted(asyncio.run(scenario())) == [0, 1]
+    assert saved_rows(db_path) == ([("arxiv",)], [("nips",)])
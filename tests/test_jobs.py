@@ -0,0 +1,81 @@
+# tests/test_jobs.py
+import pytest
+
+from config.settings import RESULTS_PER_PAGE, PAGINATION_MIN_NEW_RATIO
+from main import next_page_job, build_refresh_jobs, build_topic_jobs, load_batch_specs
+
+
+def job(**extra):
+    return {'query': 'q', 'page': 1, 'max_pages': 5, 'years': {}, **extra}
+
+
+# --- ADAPTIVE PAGINATION ---
+def test_next_page_continues_on_a_productive_page():
+    follow_up, reason, stats = next_page_job(job(), RESULTS_PER_PAGE, 10, 10)
+    assert reason is None
+    assert follow_up['page'] == 2
+    assert follow_up['yield'] == stats == {"pages": 1, "found": 10, "new": 10}
+
+
+def test_next_page_stops_at_max_pages():
+    assert next_page_job(job(page=5), RESULTS_PER_PAGE, 10, 10)[:2] == (None, "max_pages")
+
+
+def test_next_page_stops_on_short_page():
+    assert next_page_job(job(), RESULTS_PER_PAGE - 1, 9, 9)[:2] == (None, "short_page")
+
+
+def test_next_page_stops_on_low_yield():
+    new = int(10 * PAGINATION_MIN_NEW_RATIO) - 1
+    assert next_page_job(job(), RESULTS_PER_PAGE, 10, max(new, 0))[:2] == (None, "low_yield")
+
+
+def test_next_page_accumulates_yield():
+    first, _, _ = next_page_job(job(), RESULTS_PER_PAGE, 10, 10)
+    _, _, stats = next_page_job(first, RESULTS_PER_PAGE, 10, 8)
+    assert stats == {"pages": 2, "found": 20, "new": 18}
+
+
+def test_refresh_stops_only_when_nothing_is_new():
+    follow_up, reason, _ = next_page_job(job(refresh="2026-01-01"), RESULTS_PER_PAGE, 10, 1)
+    assert reason is None and follow_up['page'] == 2
+    assert next_page_job(job(refresh="2026-01-01"), RESULTS_PER_PAGE, 10, 0)[:2] == (None, "all_known")
+
+
+# --- REFRESH ---
+def tracked(query, years=None, last="2024-05-01 10:00:00"):
+    return {"query": query, "last_crawled": last, "years": years or {}, "prefs": {"sort_by": "relevance"}}
+
+
+def test_refresh_narrows_years_to_last_crawl():
+    jobs = build_refresh_jobs([tracked("a", {"min": "2020"}), tracked("b")], 3, "2026-10-18")
+    assert [j['years'] for j in jobs] == [{"min": "2024"}, {"min": "2024"}]
+    assert all(j['refresh'] == "2026-10-18" and j['prefs']['sort_by'] == "date" for j in jobs)
+
+
+def test_refresh_skips_closed_windows_and_bad_years():
+    jobs = build_refresh_jobs([tracked("closed", {"max": "2020"}), tracked("bad", {"min": "recent"}),
+                               tracked("ok", {"max": "2030"})], 3, "2026-10-18")
+    assert [j['query'] for j in jobs] == ["ok"]
+
+
+# --- BATCH FILES ---
+def test_load_batch_specs(tmp_path):
+    path = tmp_path / "topics.txt"
+    path.write_text('# comment\n\nplain topic\n{"query": "literal", "pages": "2"}\n', encoding="utf-8")
+    assert load_batch_specs(str(path)) == [{"topic": "plain topic"}, {"query": "literal", "pages": 2}]
+
+
+@pytest.mark.parametrize("line", ['{"years": {}}', '{"query": "q", "pages": 0}', '{"query": "q", "pages": "x"}',
+                                  '{"query": "q"'])
+def test_load_batch_specs_rejects_bad_lines(tmp_path, line):
+    path = tmp_path / "topics.txt"
+    path.write_text(line + "\n", encoding="utf-8")
+    with pytest.raises(ValueError, match=":1:"):
+        load_batch_specs(str(path))
+
+
+def test_build_topic_jobs():
+    assert build_topic_jobs(["a"], 3, {"min": "2020"}) == [
+        {'query': 'a', 'page': 1, 'max_pages': 3, 'years': {"min": "2020"}}
+    ]
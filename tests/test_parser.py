@@ -0,0 +1,78 @@
+# tests/test_parser.py
+import pytest
+
+from conftest import read_fixture
+from scraper.parser import ScholarParser, available_backends, parse_meta, parse_footer
+
+
+# --- .gs_a META LINE ---
+def test_parse_meta_full_line():
+    authors, venue, publisher = parse_meta("A Vaswani, N Shazeer, N Parmar - Advances in neural information "
+                                           "processing systems, 2017 - proceedings.neurips.cc")
+    assert authors == ("A Vaswani", "N Shazeer", "N Parmar")
+    assert venue == "Advances in neural information processing systems"
+    assert publisher == "proceedings.neurips.cc"
+
+
+def test_parse_meta_host_only():
+    assert parse_meta("K He, X Zhang - openaccess.thecvf.com") == (("K He", "X Zhang"), None, "openaccess.thecvf.com")
+
+
+def test_parse_meta_venue_without_host():
+    assert parse_meta("Y LeCun - Nature, 2015") == (("Y LeCun",), "Nature", None)
+
+
+def test_parse_meta_truncated_authors_are_kept():
+    authors, _, _ = parse_meta("A Smith, B Jones… - Nature, 2015 - nature.com")
+    assert authors == ("A Smith", "B Jones")
+
+
+def test_parse_meta_truncated_venue_is_dropped():
+    _, venue, publisher = parse_meta("A Smith - Proceedings of the IEEE conference on …, 2016 - ieeexplore.ieee.org")
+    assert venue is None
+    assert publisher == "ieeexplore.ieee.org"
+
+
+# --- .gs_fl FOOTER ---
+def test_parse_footer_cited_by_and_cluster():
+    links = [("/scholar?cites=123456&as_sdt=5", "Cited by 42"), ("/scholar?q=related:x", "Related articles"),
+             ("/scholar?cluster=123456&hl=en", "All 7 versions")]
+    assert parse_footer(links) == (42, "123456")
+
+
+def test_parse_footer_uncited_paper_uses_versions_link():
+    assert parse_footer([("/scholar?cluster=987&hl=en", "All 2 versions")]) == (0, "987")
+
+
+def test_parse_footer_empty():
+    assert parse_footer([]) == (0, None)
+
+
+# --- BACKENDS ---
+@pytest.mark.parametrize("backend", available_backends())
+def test_parse_page_counts_every_block(backend):
+    count, papers = ScholarParser(backend).parse_page(read_fixture("results_full.html"), "kw")
+    assert count == 10
+    assert len(papers) == 9     # One citation-only result has no link
+    assert all(p.url and p.keyword == "kw" for p in papers)
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_parse_page_counts_blocks_regardless_of_markup(backend):
+    html = ("<div id='gs_res_ccl_mid'>"
+            "<div class='gs_r'><div class=\"gs_ri gs_or\"><h3 class=gs_rt><a href='http://a'>One paper title here</a></h3>"
+            "<div class=gs_a>A Author - Venue, 2010 - a.org</div></div></div>"
+            "<div class='gs_r'><div class=gs_ri><h3 class=gs_rt>[CITATION] No link</h3></div></div></div>")
+    count, papers = ScholarParser(backend).parse_page(html, "kw")
+    assert count == 2
+    assert [p.url for p in papers] == ["http://a"]
+
+
+def test_backends_agree():
+    html = read_fixture("results_full.html")
+    results = {b: ScholarParser(b).parse_page(html, "kw") for b in available_backends()}
+    assert len(set(map(repr, results.values()))) == 1
+
+
+def test_parse_page_empty():
+    assert ScholarParser().parse_page("", "kw") == (0, [])